@@ -1,26 +1,187 @@
+import random
+
+from domino_board import DominoBoard
+from domino_hand import DOUBLE_MASK, VALUE_MASK, hand_mask, hand_tiles, highest_tile, playable
+from domino_tiles import IS_DOUBLE, TILE_SCORE, tile_id
+from game_settings import GameSettings
+from endgame_solver import EndgameSolver
+from ismcts import ISMCTS
+
+EXPERT_ENDGAME_THRESHOLD = 10
+# Hard's reward for a move the next player is known to have to pass on
+BLOCK_NEXT_BONUS = 3
+
+# All-Fives: how much a point scored by a play counts against _tile_move_score
+FIVES_WEIGHT = 2
+
 class AIPlayer:
-    def __init__(self, difficulty="medium"):
+    def __init__(self, difficulty="medium", time_budget=None, max_iterations=None, endgame_threshold=None,
+                 move_cache=None, rng=None):
         self.difficulty = difficulty
+        # Source of every random choice; DominoEngine hands each seat its own, see its seed
+        self.rng = rng or random.Random()
+        # Search budget for "expert", in seconds; defaults to GameSettings.ai_delay
+        if time_budget is None:
+            time_budget = GameSettings().ai_delay / 1000
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.searcher = None
+        # Tiles left in all hands at which hard/expert switch to the exact endgame solver
+        if endgame_threshold is None:
+            endgame_threshold = EXPERT_ENDGAME_THRESHOLD if difficulty == "expert" else 0
+        self.endgame_threshold = endgame_threshold
+        self.solver = None
+        # Optional MoveCache of hard's choices; they only depend on the hand, the
+        # ends and the next player's voids, so seats can share one
+        self.move_cache = move_cache
         
     def choose_move(self, hand, board):
         if self.difficulty == "easy":
             return self._choose_random_move(hand, board)
-        elif self.difficulty == "hard":
+        elif self.difficulty in ("hard", "expert"):
+            # Expert needs the whole game (see choose_play), on its own it plays like hard
             return self._choose_strategic_move(hand, board)
         else:  # medium difficulty
             return self._choose_basic_move(hand, board)
         
 
+    def choose_play(self, hand, left_end, right_end, engine=None):
+        """Tile and board side to play, (None, None) to pass.
+
+        Only "expert" picks the side itself and needs the engine to search;
+        the others leave the side to the board (None).
+        """
+        if engine is not None and type(engine.board) is not DominoBoard:
+            # Search and solver only know two-ended boards
+            return self._choose_board_play(hand, engine.board, engine.rules.play_score, engine.current_player)
+        if engine is not None and engine.rules.play_score is not None and self.difficulty in ("hard", "expert"):
+            # Search and solver only play to win the round, here points matter
+            return self._choose_board_play(hand, engine.board, engine.rules.play_score)
+        if engine is not None and self._in_endgame(engine):
+            if self.solver is None:
+                self.solver = EndgameSolver()
+            return self.solver.choose(engine, rng=self.rng)
+        if self.difficulty == "expert" and engine is not None:
+            if self.searcher is None:
+                # Seeded from ours so seeded games repeat (with max_iterations, time budgets never do)
+                self.searcher = ISMCTS(self.time_budget, self.max_iterations,
+                                       rng=random.Random(self.rng.getrandbits(64)))
+            play = self.searcher.choose(engine)
+            if play is not None:
+                return play
+        next_voids = 0
+        if engine is not None and self.difficulty == "hard":
+            next_voids = engine.knowledge.void_values[(engine.current_player + 1) % engine.num_players]
+        return self.choose_tile(hand, left_end, right_end, next_voids), None
+
+    def _in_endgame(self, engine):
+        if self.difficulty not in ("hard", "expert") or engine.board.left_end is None:
+            return False
+        # The solver does not know about draws, wait for the boneyard to run out
+        if engine.settings.draw_from_boneyard and engine.remaining_pieces:
+            return False
+        remaining = sum(hand.bit_count() for hand in engine.players)
+        return remaining <= self.endgame_threshold
+
+    def choose_tile(self, hand, left_end, right_end, next_voids=0):
+        """Same strategies as choose_move, for a bitmask hand.
+
+        left_end/right_end are None while the board is empty. next_voids
+        has bit v set when the next player is known to hold no v (see
+        KnowledgeTracker); hard likes moves that leave that player stuck.
+        Returns a tile id or None to pass.
+        """
+        if left_end is None:
+            return self._choose_opening_tile(hand)
+
+        moves = playable(hand, left_end, right_end)
+        if not moves:
+            return None
+
+        if self.difficulty in ("hard", "expert"):
+            return self._choose_strategic_tile(hand, moves, left_end, right_end, next_voids)
+        # Easy and medium both take any valid piece once the board is open
+        return self.rng.choice(hand_tiles(moves))
+
+    def _choose_opening_tile(self, hand):
+        if self.difficulty == "easy":
+            return self.rng.choice(hand_tiles(hand))
+
+        # Highest double first, otherwise the highest scoring piece
+        doubles = hand & DOUBLE_MASK
+        if doubles:
+            return highest_tile(doubles)
+        return max(hand_tiles(hand), key=lambda t: TILE_SCORE[t])
+
+    def _choose_strategic_tile(self, hand, moves, left_end, right_end, next_voids=0):
+        if self.move_cache is None:
+            return max(hand_tiles(moves),
+                       key=lambda t: self._tile_move_score(t, hand, left_end, right_end, next_voids))
+
+        key = (hand, left_end, right_end, next_voids)
+        tile = self.move_cache.get(key)
+        if tile is None:
+            tile = max(hand_tiles(moves),
+                       key=lambda t: self._tile_move_score(t, hand, left_end, right_end, next_voids))
+            self.move_cache.put(key, tile)
+        return tile
+
+    def _choose_board_play(self, hand, board, play_score=None, player=None):
+        """(tile, position) asking the board itself, for spinner and train boards and All-Fives.
+
+        board.positions says where a tile can go and board.sum_after what
+        the open ends would count afterwards, so no move is tried on the
+        board. With a play_score (see RuleSet), every point a play scores
+        is worth FIVES_WEIGHT.
+        """
+        moves = board.playable(hand, player)
+        if not moves:
+            return None, None
+        if self.difficulty not in ("hard", "expert"):
+            tile = self.rng.choice(hand_tiles(moves)) if board else self._choose_opening_tile(hand)
+            return tile, None
+        if not board and play_score is None:
+            return self._choose_opening_tile(hand), None
+
+        best, best_score = (None, None), None
+        for tile in hand_tiles(moves):
+            strategic = self._tile_move_score(tile, hand)
+            for position in board.positions(tile, player):
+                score = strategic
+                if play_score is not None:
+                    score += FIVES_WEIGHT * play_score(board.sum_after(tile, position))
+                if best_score is None or score > best_score:
+                    best, best_score = (tile, position), score
+        return best
+
+    def _tile_move_score(self, tile, hand, left_end=None, right_end=None, next_voids=0):
+        # _calculate_move_score without rescanning the hand
+        score = TILE_SCORE[tile]
+        if IS_DOUBLE[tile]:
+            score += 5
+        matching = hand & (VALUE_MASK[tile.value1] | VALUE_MASK[tile.value2])
+        score += matching.bit_count() * 2
+
+        if next_voids:
+            # Where the board will put it: the start if it fits there
+            if tile.value1 == left_end or tile.value2 == left_end:
+                left_end = TILE_SCORE[tile] - left_end
+            else:
+                right_end = TILE_SCORE[tile] - right_end
+            if next_voids >> left_end & 1 and next_voids >> right_end & 1:
+                score += BLOCK_NEXT_BONUS
+        return score
+
     def _choose_random_move(self, hand, board):
         if not board:
-            return random.randint(0, len(hand) - 1)
+            return self.rng.randint(0, len(hand) - 1)
             
         valid_moves = []
         for i, piece in enumerate(hand):
             if self._can_play_piece(piece, board[0], board[-1]):
                 valid_moves.append(i)
                 
-        return random.choice(valid_moves) if valid_moves else None
+        return self.rng.choice(valid_moves) if valid_moves else None
     
     def _choose_basic_move(self, hand, board):
         if not board:
@@ -64,17 +225,16 @@ class AIPlayer:
             # Second priority: highest scoring piece
             return max(range(len(hand)), key=lambda i: hand[i].get_score())
             
-        valid_moves = []
-        for i, piece in enumerate(hand):
-            if self._can_play_piece(piece, board[0], board[-1]):
-                score = self._calculate_move_score(piece, hand, board)
-                valid_moves.append((i, score))
-            
-        if not valid_moves:
+        # Score through the bitmask hand instead of _calculate_move_score,
+        # which rescans the hand for every candidate
+        ids = [tile_id(piece.value1, piece.value2) for piece in hand]
+        mask = hand_mask(ids)
+        left_end, right_end = board[0].value1, board[-1].value2
+        moves = playable(mask, left_end, right_end)
+        if not moves:
             return None
-        
-        # Return the move with highest score
-        return max(valid_moves, key=lambda x: x[1])[0]
+
+        return ids.index(self._choose_strategic_tile(mask, moves, left_end, right_end))
 
 
         
@@ -1,12 +1,15 @@
+from domino_tiles import MAX_PIP_VALUE
+
+
 class Domino:
     def __init__(self, value1, value2):
         try:
             self.value1 = int(value1)
             self.value2 = int(value2)   
-            if not (0 <= self.value1 <= 7 and 0 <= self.value2 <= 7):
-                raise ValueError("Domino values must be between 0 and 7")
+            if not (0 <= self.value1 <= MAX_PIP_VALUE and 0 <= self.value2 <= MAX_PIP_VALUE):
+                raise ValueError(f"Domino values must be between 0 and {MAX_PIP_VALUE}")
         except ValueError:
-            raise ValueError("Domino values must be valid integers between 0 and 7")
+            raise ValueError(f"Domino values must be valid integers between 0 and {MAX_PIP_VALUE}")
 
     def __repr__(self):
         return f"[{self.value1}|{self.value2}]"
@@ -0,0 +1,499 @@
+from collections import deque
+
+from domino_hand import VALUE_MASK, playable, value_tiles
+from domino_tiles import HIGH_PIPS, IS_DOUBLE, LOW_PIPS, MAX_PIP_VALUE, TILE_SCORE, TILES
+
+
+def fives_score(end_sum):
+    """Points an All-Fives play makes: the open-end count when it is a multiple of five."""
+    return end_sum if end_sum % 5 == 0 else 0
+
+
+def round_to_five(pips):
+    """Pips left in the other hands, to the nearest five, for going out in All-Fives."""
+    return 5 * ((pips + 2) // 5)
+
+
+class DominoBoard:
+    """Line of play with O(1) placement at both ends.
+
+    The open ends are cached in left_end/right_end, value_counts[v]
+    tallies how many placed tiles carry v and tiles_mask has a bit per
+    placed tile, so nothing has to look at board[0]/board[-1] or walk the
+    line to answer a legality question. end_sum is the All-Fives count
+    of the open ends (a double at an end counts both halves), kept up to
+    date on every placement.
+    Indexing, len() and truth testing behave like the old list board.
+    """
+
+    def __init__(self, max_value=MAX_PIP_VALUE):
+        self.pieces = deque()
+        self.left_end = None
+        self.right_end = None
+        self.left_double = False
+        self.right_double = False
+        self.end_sum = 0
+        self.value_counts = [0] * (max_value + 1)
+        self.tiles_mask = 0
+
+    def __len__(self):
+        return len(self.pieces)
+
+    def __bool__(self):
+        return bool(self.pieces)
+
+    def __iter__(self):
+        return iter(self.pieces)
+
+    def __getitem__(self, index):
+        return self.pieces[index]
+
+    def __repr__(self):
+        return " ".join(str(piece) for piece in self.pieces)
+
+    def clear(self):
+        self.pieces.clear()
+        self.left_end = None
+        self.right_end = None
+        self.left_double = False
+        self.right_double = False
+        self.end_sum = 0
+        self.value_counts = [0] * len(self.value_counts)
+        self.tiles_mask = 0
+
+    @property
+    def open_mask(self):
+        """Bit v set when an open end shows v."""
+        if self.left_end is None:
+            return 0
+        return (1 << self.left_end) | (1 << self.right_end)
+
+    def open_values(self, player=None):
+        """open_mask; boards with private lines answer per player."""
+        return self.open_mask
+
+    def playable(self, hand, player=None):
+        """Tiles of the hand that can go down, all of them on an empty board."""
+        if self.left_end is None:
+            return hand
+        return playable(hand, self.left_end, self.right_end)
+
+    def positions(self, tile, player=None):
+        """Sides the tile can be placed at, for callers that want to pick one."""
+        if self.left_end is None:
+            return ['end']
+        return [side for side in ('start', 'end') if self.fits(tile, side)]
+
+    def fits(self, tile, position=None):
+        if self.left_end is None:
+            return True
+        low, high = LOW_PIPS[tile], HIGH_PIPS[tile]
+        if position != 'end' and self.left_end in (low, high):
+            return True
+        return position != 'start' and self.right_end in (low, high)
+
+    def sum_after(self, tile, position=None):
+        """end_sum the board would have with tile placed, without placing it."""
+        if self.left_end is None:
+            return TILE_SCORE[tile]
+
+        low, high = LOW_PIPS[tile], HIGH_PIPS[tile]
+        double = IS_DOUBLE[tile]
+        left = self.left_end * (2 if self.left_double else 1)
+        right = self.right_end * (2 if self.right_double else 1)
+        if position != 'end' and self.left_end in (low, high):
+            left = 2 * low if double else TILE_SCORE[tile] - self.left_end
+        else:
+            right = 2 * low if double else TILE_SCORE[tile] - self.right_end
+        return left + right
+
+    def place(self, tile, position=None):
+        """Put the tile down, turned the right way, at 'start' or 'end'.
+
+        With no position the start is tried first. Returns the side used,
+        or None when the tile does not fit.
+        """
+        low, high = LOW_PIPS[tile], HIGH_PIPS[tile]
+        piece = TILES[tile]
+
+        if self.left_end is None:
+            self.pieces.append(piece)
+            self.left_end, self.right_end = low, high
+            side = 'end'
+        elif position != 'end' and self.left_end in (low, high):
+            # The matching half faces the board, the other half becomes the new end
+            if high != self.left_end:
+                piece = piece.flip()
+            self.pieces.appendleft(piece)
+            self.left_end = piece.value1
+            side = 'start'
+        elif position != 'start' and self.right_end in (low, high):
+            if low != self.right_end:
+                piece = piece.flip()
+            self.pieces.append(piece)
+            self.right_end = piece.value2
+            side = 'end'
+        else:
+            return None
+
+        if len(self.pieces) == 1:
+            self.left_double = self.right_double = IS_DOUBLE[tile]
+            self.end_sum = TILE_SCORE[tile]
+        else:
+            if side == 'start':
+                self.left_double = IS_DOUBLE[tile]
+            else:
+                self.right_double = IS_DOUBLE[tile]
+            self.end_sum = (self.left_end * (2 if self.left_double else 1)
+                            + self.right_end * (2 if self.right_double else 1))
+
+        self.tiles_mask |= 1 << tile
+        self.value_counts[low] += 1
+        if high != low:
+            self.value_counts[high] += 1
+        return side
+
+
+CENTRE = -1
+
+
+class SpinnerBoard:
+    """Board where the first double, the spinner, opens four arms.
+
+    Each arm is a line going out from the first tile with one open end.
+    arms_at[v] lists the arms open at v and open_mask has bit v set while
+    any arm is, so legal moves only look at the distinct open values and
+    never at every arm. The spinner's two side arms open once it has been
+    played on along its length on both sides (for a spinner that is not
+    the first tile, on its outer side).
+
+    place() and fits() take an arm index where DominoBoard takes
+    'start'/'end', and place() reports the first tile as CENTRE.
+    left_end/right_end are the ends of arms 0 and 1, kept so that
+    "left_end is None" still means an empty board.
+    """
+
+    def __init__(self, max_value=MAX_PIP_VALUE):
+        self.arms_at = [[] for _ in range(max_value + 1)]
+        self.value_counts = [0] * (max_value + 1)
+        self.clear()
+
+    def __len__(self):
+        return len(self.pieces)
+
+    def __bool__(self):
+        return bool(self.pieces)
+
+    def __iter__(self):
+        return (piece for piece, _ in self.pieces)
+
+    def __repr__(self):
+        return " ".join(str(piece) for piece, _ in self.pieces)
+
+    def clear(self):
+        # (piece, arm) in the order they were played, each piece turned so
+        # value1 faces the spinner and value2 is the open side
+        self.pieces = []
+        self.arms = []
+        self.arm_ends = []
+        self.arm_doubles = []
+        for arms in self.arms_at:
+            arms.clear()
+        self.open_mask = 0
+        self.spinner = None
+        self.spinner_waiting = set()
+        self.left_end = None
+        self.right_end = None
+        self.end_sum = 0
+        self.value_counts = [0] * len(self.value_counts)
+        self.tiles_mask = 0
+
+    def open_arms(self):
+        return len(self.arms)
+
+    def fits(self, tile, arm=None):
+        if not self.pieces:
+            return True
+        if arm is None:
+            return bool(self.open_mask >> LOW_PIPS[tile] & 1 or self.open_mask >> HIGH_PIPS[tile] & 1)
+        return self.arm_ends[arm] in (LOW_PIPS[tile], HIGH_PIPS[tile])
+
+    def open_values(self, player=None):
+        return self.open_mask
+
+    def playable(self, hand, player=None):
+        if not self.pieces:
+            return hand
+        return hand & value_tiles(self.open_mask)
+
+    def positions(self, tile, player=None):
+        """Arms the tile can be placed on, one per distinct open value it matches."""
+        if not self.pieces:
+            return [CENTRE]
+        low, high = LOW_PIPS[tile], HIGH_PIPS[tile]
+        arms = [self.arms_at[low][0]] if self.arms_at[low] else []
+        if high != low and self.arms_at[high]:
+            arms.append(self.arms_at[high][0])
+        return arms
+
+    def _count(self, arm):
+        # What an arm adds to end_sum: a double at the end counts both halves
+        if self.arms[arm]:
+            return self.arm_ends[arm] * (2 if self.arm_doubles[arm] else 1)
+        if arm < 2:
+            # Bare side of the first tile
+            return self.arm_ends[arm] * (2 if self.arm_doubles[arm] else 1)
+        return 0
+
+    def _pick_arm(self, tile):
+        low, high = LOW_PIPS[tile], HIGH_PIPS[tile]
+        if self.arms_at[low]:
+            return self.arms_at[low][0]
+        if self.arms_at[high]:
+            return self.arms_at[high][0]
+        return None
+
+    def sum_after(self, tile, arm=None):
+        """end_sum the board would have with tile placed, without placing it."""
+        if not self.pieces:
+            return TILE_SCORE[tile]
+        if arm is None:
+            arm = self._pick_arm(tile)
+        new_end = TILE_SCORE[tile] - self.arm_ends[arm]
+        new_count = new_end * (2 if IS_DOUBLE[tile] else 1)
+        if len(self.pieces) == 1:
+            # Only the first tile is down, its other side still counts
+            return new_count + self._count(1 - arm)
+        return self.end_sum - self._count(arm) + new_count
+
+    def _open_arm(self, value, double):
+        arm = len(self.arms)
+        self.arms.append([])
+        self.arm_ends.append(value)
+        self.arm_doubles.append(double)
+        self.arms_at[value].append(arm)
+        self.open_mask |= 1 << value
+        return arm
+
+    def place(self, tile, arm=None):
+        """Put the tile on an arm, the first arm it fits when arm is None.
+
+        Returns the arm used, CENTRE for the first tile, or None when the
+        tile does not fit.
+        """
+        low, high = LOW_PIPS[tile], HIGH_PIPS[tile]
+        double = IS_DOUBLE[tile]
+
+        if not self.pieces:
+            self.pieces.append((TILES[tile], CENTRE))
+            self._open_arm(low, double)
+            self._open_arm(high, double)
+            if double:
+                self.spinner = tile
+                self.spinner_waiting = {0, 1}
+            self.end_sum = TILE_SCORE[tile]
+            self.left_end, self.right_end = low, high
+            self.tiles_mask |= 1 << tile
+            self.value_counts[low] += 1
+            if high != low:
+                self.value_counts[high] += 1
+            return CENTRE
+
+        if arm is None:
+            arm = self._pick_arm(tile)
+            if arm is None:
+                return None
+        end = self.arm_ends[arm]
+        if end != low and end != high:
+            return None
+
+        # The matching half faces the spinner, the other half is the new end
+        piece = TILES[tile] if low == end else TILES[tile].flip()
+        new_end = piece.value2
+        old_count = self._count(arm)
+        self.arms[arm].append(piece)
+        self.pieces.append((piece, arm))
+
+        arms = self.arms_at[end]
+        arms.remove(arm)
+        if not arms:
+            self.open_mask &= ~(1 << end)
+        self.arms_at[new_end].append(arm)
+        self.open_mask |= 1 << new_end
+        self.arm_ends[arm] = new_end
+        self.arm_doubles[arm] = double
+
+        if len(self.pieces) == 2:
+            self.end_sum = self._count(0) + self._count(1)
+        else:
+            self.end_sum += self._count(arm) - old_count
+
+        # Played past the spinner along its length, its sides open up
+        if arm in self.spinner_waiting:
+            self.spinner_waiting.discard(arm)
+            if not self.spinner_waiting:
+                value = LOW_PIPS[self.spinner]
+                self._open_arm(value, True)
+                self._open_arm(value, True)
+        if double and self.spinner is None:
+            self.spinner = tile
+            self.spinner_waiting = {arm}
+
+        self.left_end, self.right_end = self.arm_ends[0], self.arm_ends[1]
+        self.tiles_mask |= 1 << tile
+        self.value_counts[low] += 1
+        if high != low:
+            self.value_counts[high] += 1
+        return arm
+
+
+class TrainBoard:
+    """Mexican Train table: a hub double, a private train per seat and the public Mexican train.
+
+    Train i belongs to seat i and train num_players is the Mexican train.
+    A seat may play on its own train, on the Mexican train and on any
+    train marked open. trains_at[v] lists the trains ending at v,
+    public_at[v] counts the ones anybody may play on and public_mask has
+    bit v set while that count is positive, so a seat's moves come from
+    its own end plus public_mask instead of a walk over every train.
+    """
+
+    def __init__(self, max_value=MAX_PIP_VALUE, num_players=4):
+        self.num_players = num_players
+        self.mexican = num_players
+        self.trains_at = [[] for _ in range(max_value + 1)]
+        self.public_at = [0] * (max_value + 1)
+        self.value_counts = [0] * (max_value + 1)
+        self.clear()
+
+    def __len__(self):
+        return len(self.pieces)
+
+    def __bool__(self):
+        return bool(self.pieces)
+
+    def __iter__(self):
+        return (piece for piece, _ in self.pieces)
+
+    def __repr__(self):
+        return " ".join(str(piece) for piece, _ in self.pieces)
+
+    def clear(self):
+        # (piece, train) in the order they were played, the hub has train None
+        self.pieces = []
+        self.hub = None
+        self.trains = [[] for _ in range(self.num_players + 1)]
+        self.train_ends = [None] * (self.num_players + 1)
+        # Open markers, the Mexican train is always open
+        self.open_trains = [False] * self.num_players + [True]
+        for trains in self.trains_at:
+            trains.clear()
+        self.public_at = [0] * len(self.public_at)
+        self.public_mask = 0
+        self.left_end = None
+        self.right_end = None
+        self.tiles_mask = 0
+        self.value_counts = [0] * len(self.value_counts)
+
+    def start(self, hub):
+        """Lay the hub double, every train starts from its value."""
+        value = LOW_PIPS[hub]
+        self.hub = hub
+        self.pieces.append((TILES[hub], None))
+        for train in range(self.num_players + 1):
+            self.train_ends[train] = value
+            self.trains_at[value].append(train)
+        self._add_public(value)
+        self.left_end = self.right_end = value
+        self.tiles_mask |= 1 << hub
+        self.value_counts[value] += 1
+
+    def _add_public(self, value):
+        self.public_at[value] += 1
+        self.public_mask |= 1 << value
+
+    def _remove_public(self, value):
+        self.public_at[value] -= 1
+        if not self.public_at[value]:
+            self.public_mask &= ~(1 << value)
+
+    def set_open(self, train, is_open=True):
+        if self.open_trains[train] == is_open or train == self.mexican:
+            return
+        self.open_trains[train] = is_open
+        if is_open:
+            self._add_public(self.train_ends[train])
+        else:
+            self._remove_public(self.train_ends[train])
+
+    def may_play(self, train, player):
+        return player is None or train == player or self.open_trains[train]
+
+    def open_values(self, player=None):
+        """Values the player can play on: the own train's end and every public end."""
+        if player is None or not self.pieces:
+            return self.public_mask
+        return self.public_mask | (1 << self.train_ends[player])
+
+    def playable(self, hand, player=None):
+        if not self.pieces:
+            return hand
+        return hand & value_tiles(self.open_values(player))
+
+    def fits(self, tile, train, player=None):
+        return (self.may_play(train, player)
+                and self.train_ends[train] in (LOW_PIPS[tile], HIGH_PIPS[tile]))
+
+    def positions(self, tile, player=None):
+        """Trains the player can put the tile on.
+
+        An open own train comes first, playing there takes the marker off;
+        otherwise public trains come before the own one, which stays
+        private for later.
+        """
+        low, high = LOW_PIPS[tile], HIGH_PIPS[tile]
+        trains = []
+        for value in (low, high) if high != low else (low,):
+            for train in self.trains_at[value]:
+                if train != player and self.may_play(train, player):
+                    trains.append(train)
+        if player is not None and self.train_ends[player] in (low, high):
+            if self.open_trains[player]:
+                trains.insert(0, player)
+            else:
+                trains.append(player)
+        return trains
+
+    def place(self, tile, train=None):
+        """Add the tile to the end of a train, any train it fits when train is None.
+
+        Who may use which train is the caller's business (see positions).
+        Returns the train used, or None when the tile does not fit.
+        """
+        low, high = LOW_PIPS[tile], HIGH_PIPS[tile]
+        if train is None:
+            trains = self.trains_at[low] or self.trains_at[high]
+            if not trains:
+                return None
+            train = trains[0]
+        end = self.train_ends[train]
+        if end != low and end != high:
+            return None
+
+        piece = TILES[tile] if low == end else TILES[tile].flip()
+        new_end = piece.value2
+        self.trains[train].append(piece)
+        self.pieces.append((piece, train))
+
+        self.trains_at[end].remove(train)
+        self.trains_at[new_end].append(train)
+        if self.open_trains[train]:
+            self._remove_public(end)
+            self._add_public(new_end)
+        self.train_ends[train] = new_end
+
+        self.tiles_mask |= 1 << tile
+        self.value_counts[low] += 1
+        if high != low:
+            self.value_counts[high] += 1
+        return train
@@ -0,0 +1,300 @@
+import hashlib
+import random
+
+from ai_player import AIPlayer
+from game_settings import GameSettings
+from game_state import GameState
+from domino_board import DominoBoard, SpinnerBoard
+from domino_hand import DOUBLE_MASK, hand_mask, hand_score, highest_tile
+from domino_tiles import HIGH_PIPS, LOW_PIPS, TILE_SCORE, deck
+from game_rules import RULE_SETS, get_rules
+from knowledge import KnowledgeTracker
+
+
+# Modes played on a two-ended or spinner board, see game_rules for the rest
+GAME_MODES = tuple(RULE_SETS)
+
+
+class RoundResult:
+    def __init__(self, winner, points, blocked, turns, passes_per_player, player_sums, move_points=None):
+        self.winner = winner
+        # Points for winning the round, All-Fives plays score on their own in move_points
+        self.points = points
+        self.move_points = move_points
+        self.blocked = blocked
+        self.turns = turns
+        self.passes_per_player = passes_per_player
+        self.player_sums = player_sums
+
+    def __repr__(self):
+        how = "blocked" if self.blocked else "domino"
+        return f"RoundResult(winner={self.winner}, points={self.points}, {how}, turns={self.turns})"
+
+
+class DominoEngine(GameState):
+    """Headless game rules taken out of DominoGameGUI.
+
+    Nothing here touches a widget or a timer, so a whole round can be played
+    with play_round() and the result inspected straight away. With a seed
+    the deals and every seat's AI draw from one generator, so the same seed
+    plays the same games (see replay for checking a single round).
+    """
+
+    def __init__(self, settings=None, mode='Classic', ai_players=None, target_score=100, seed=None):
+        super().__init__()
+        # Scoring is looked up once, play and _finish_round call it directly
+        self.rules = get_rules(mode)
+
+        self.settings = settings or GameSettings()
+        self.settings.validate()
+        self.current_mode = mode
+        self.target_score = target_score
+        self.num_players = self.settings.num_players
+
+        # One AI per seat, the engine plays every seat on its own
+        if ai_players is None:
+            ai_players = [AIPlayer() for _ in range(self.num_players)]
+        if len(ai_players) != self.num_players:
+            raise ValueError("Need exactly one AI player per seat")
+        self.ai_players = ai_players
+
+        self.seed = seed
+        self.rng = random.Random(seed)
+        if seed is not None:
+            for ai in ai_players:
+                ai.rng = random.Random(self.rng.getrandbits(64))
+
+        self.scores = [0] * self.num_players
+        self.passes_per_player = [0] * self.num_players
+        self.move_points = [0] * self.num_players
+        self.pip_sums = [0] * self.num_players
+        self.remaining_pips = 0
+        self.remaining_pieces = []
+        board_class = SpinnerBoard if self.settings.spinner else DominoBoard
+        self.board = board_class(self.settings.max_piece_value)
+        self.knowledge = KnowledgeTracker(self.num_players, self.settings.max_piece_value)
+        self.turns = 0
+        self.round_number = 0
+        # round_number before the current match's first round, see play_match
+        self.match_start = 0
+        self.history = []
+        self.last_winner = None
+        self.last_mode = None
+        self.result = None
+
+    def new_round(self, round_seed=None):
+        """Deal a new round, shuffled with round_seed or a fresh one from the engine's generator."""
+        self.game_active = True
+        self.consecutive_passes = 0
+        self.passes_per_player = [0] * self.num_players
+        self.move_points = [0] * self.num_players
+        self.turns = 0
+        self.round_number += 1
+        # (player, tile, side) for every turn, tile and side are None for a pass
+        self.history = []
+        self.result = None
+        # The deal and the boneyard only depend on this, see _deck
+        self.round_seed = self.rng.getrandbits(64) if round_seed is None else round_seed
+
+        # Generate and deal dominoes
+        dominoes = self._deck()
+
+        # Hands are bitmasks of tile ids, see domino_hand
+        per_player = self.settings.pieces_per_player
+        self.players = [hand_mask(dominoes[i * per_player:(i + 1) * per_player]) for i in range(self.num_players)]
+        # Pips in each hand and in all of them, kept up to date on every play and draw
+        self.pip_sums = [hand_score(hand) for hand in self.players]
+        self.remaining_pips = sum(self.pip_sums)
+        # The boneyard, drawn from the back with pop()
+        self.remaining_pieces = dominoes[self.num_players * per_player:]
+        self.board.clear()
+        self.knowledge.reset(self.num_players, self.settings.max_piece_value)
+
+        # Last winner starts if we keep playing the same mode
+        if self.last_winner is None or self.last_mode != self.current_mode:
+            self.current_player = self._find_starting_player()
+        else:
+            self.current_player = self.last_winner
+        self.first_player = self.current_player
+
+    def _deck(self):
+        """Shuffled tiles to deal this round."""
+        dominoes = deck(self.settings.max_piece_value)
+        random.Random(self.round_seed).shuffle(dominoes)
+        return dominoes
+
+    def _find_starting_player(self):
+        highest_double = -1
+        starting_player = 0
+
+        for player_idx, hand in enumerate(self.players):
+            doubles = hand & DOUBLE_MASK
+            if not doubles:
+                continue
+            value = LOW_PIPS[highest_tile(doubles)]
+            if value > highest_double:
+                highest_double = value
+                starting_player = player_idx
+
+        return starting_player
+
+    def open_ends(self):
+        return self.board.left_end, self.board.right_end
+
+    def legal_moves(self, player=None):
+        """Bitmask of the tiles the player can put down right now."""
+        if player is None:
+            player = self.current_player
+        return self.board.playable(self.players[player], player)
+
+    def has_valid_move(self, player=None):
+        return self.legal_moves(player) != 0
+
+    def play(self, tile, position=None):
+        """Play a tile of the current player at 'start' or 'end' of the board.
+
+        With no position the tile goes to the start when it fits there,
+        the same preference _try_play_piece uses. Returns False if the
+        tile is not in the hand or cannot be played.
+        """
+        if not self.game_active:
+            return False
+
+        bit = 1 << tile
+        hand = self.players[self.current_player]
+        if not hand & bit:
+            return False
+
+        side = self.board.place(tile, position)
+        if side is None:
+            return False
+        self.history.append((self.current_player, tile, side))
+        self.knowledge.on_play(self.current_player, tile)
+        if self.rules.play_score is not None:
+            points = self.rules.play_score(self.board.end_sum)
+            if points:
+                self.scores[self.current_player] += points
+                self.move_points[self.current_player] += points
+
+        hand ^= bit
+        self.players[self.current_player] = hand
+        self.pip_sums[self.current_player] -= TILE_SCORE[tile]
+        self.remaining_pips -= TILE_SCORE[tile]
+        self.consecutive_passes = 0
+        self.turns += 1
+        if not hand:
+            self._finish_round(self.current_player, blocked=False)
+        else:
+            self.next_turn()
+        return True
+
+    def draw_until_playable(self):
+        """Draw from the boneyard for the current player until a tile fits.
+
+        Only the drawn tile is checked against the ends, the hand itself
+        was already known not to fit. Returns how many tiles were drawn.
+        """
+        player = self.current_player
+        open_values = self.board.open_values(player)
+        drawn = 0
+        while self.remaining_pieces:
+            tile = self.take_from_boneyard(player)
+            drawn += 1
+            if open_values >> LOW_PIPS[tile] & 1 or open_values >> HIGH_PIPS[tile] & 1:
+                break
+        if drawn:
+            self.knowledge.on_draw(player, open_values)
+        return drawn
+
+    def take_from_boneyard(self, player):
+        """Move the top boneyard tile into the player's hand and return it."""
+        tile = self.remaining_pieces.pop()
+        self.players[player] |= 1 << tile
+        self.pip_sums[player] += TILE_SCORE[tile]
+        self.remaining_pips += TILE_SCORE[tile]
+        return tile
+
+    def pass_turn(self):
+        if not self.game_active:
+            return
+
+        self.consecutive_passes += 1
+        self.passes_per_player[self.current_player] += 1
+        self.history.append((self.current_player, None, None))
+        if self.board:
+            self.knowledge.on_pass(self.current_player, self.board.open_values(self.current_player))
+        self.turns += 1
+
+        if self.consecutive_passes >= self.num_players:
+            self._handle_deadlock()
+        else:
+            self.next_turn()
+
+    def next_turn(self):
+        self.current_player = (self.current_player + 1) % self.num_players
+
+    def draw_for_turn(self):
+        """Draw whatever the rules make the current player draw before moving."""
+        if self.settings.draw_from_boneyard and self.board.left_end is not None and not self.has_valid_move():
+            self.draw_until_playable()
+
+    def step(self):
+        """Let the AI sitting in the current seat take its turn."""
+        self.draw_for_turn()
+        left_end, right_end = self.open_ends()
+        tile, position = self.ai_players[self.current_player].choose_play(
+            self.players[self.current_player], left_end, right_end, self)
+
+        if tile is None or not self.play(tile, position):
+            self.pass_turn()
+
+    def play_round(self):
+        self.new_round()
+        while self.game_active:
+            self.step()
+        return self.result
+
+    def play_match(self):
+        """Play rounds until somebody reaches target_score and return the winner's seat."""
+        self.scores = [0] * self.num_players
+        # A new match opens with the highest double again
+        self.last_winner = None
+        self.match_start = self.round_number
+        while max(self.scores) < self.target_score:
+            self.play_round()
+        return self.scores.index(max(self.scores))
+
+    def state_hash(self):
+        """Hex digest of the round so far: hands, boneyard, moves, passes and scores of plays.
+
+        Built from plain ints and strings only, so it is the same on every
+        platform and Python version.
+        """
+        result = self.result
+        # Tiles are Tile ints, their repr is not a number
+        history = tuple((player, None if tile is None else int(tile), side) for player, tile, side in self.history)
+        state = (
+            self.current_mode, self.current_player, self.game_active,
+            tuple(self.players), tuple(map(int, self.remaining_pieces)), self.board.tiles_mask,
+            history, tuple(self.passes_per_player), tuple(self.move_points),
+            None if result is None else (result.winner, result.points, result.blocked),
+        )
+        return hashlib.sha256(repr(state).encode()).hexdigest()
+
+    def _handle_deadlock(self):
+        winner_index = self.rules.tiebreak(self.pip_sums, self.passes_per_player)
+        self._finish_round(winner_index, blocked=True)
+
+    def _finish_round(self, winner_index, blocked):
+        player_sums = list(self.pip_sums)
+        points = self._round_points(winner_index)
+        self.scores[winner_index] += points
+
+        self.game_active = False
+        self.last_winner = winner_index
+        self.last_mode = self.current_mode
+        self.result = RoundResult(winner_index, points, blocked, self.turns,
+                                  list(self.passes_per_player), player_sums, list(self.move_points))
+
+    def _round_points(self, winner_index):
+        return self.rules.payout(self.pip_sums, self.remaining_pips, winner_index)
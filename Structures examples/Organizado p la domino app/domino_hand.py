@@ -0,0 +1,61 @@
+"""Hands as bitsets: bit t is set when the hand holds tile id t.
+
+Legal moves against a board with open ends l and r are
+hand & (VALUE_MASK[l] | VALUE_MASK[r]), and a pass is that being zero.
+"""
+from domino_tiles import IS_DOUBLE, MAX_PIP_VALUE, NUM_TILES, TILES, TILES_WITH_VALUE, TILE_SCORE, tile_count
+
+# VALUE_MASK[v] has a bit for every tile carrying v
+VALUE_MASK = tuple(sum(1 << t for t in TILES_WITH_VALUE[v]) for v in range(MAX_PIP_VALUE + 1))
+DOUBLE_MASK = sum(1 << t for t in range(NUM_TILES) if IS_DOUBLE[t])
+
+
+def set_mask(max_value):
+    """Every tile of the double-max_value set."""
+    return (1 << tile_count(max_value)) - 1
+
+
+def hand_mask(tiles):
+    mask = 0
+    for t in tiles:
+        mask |= 1 << t
+    return mask
+
+
+def iter_tiles(mask):
+    """Tiles in the mask, lowest id first."""
+    while mask:
+        low = mask & -mask
+        yield TILES[low.bit_length() - 1]
+        mask ^= low
+
+
+def hand_tiles(mask):
+    return list(iter_tiles(mask))
+
+
+def lowest_tile(mask):
+    return TILES[(mask & -mask).bit_length() - 1]
+
+
+def highest_tile(mask):
+    # Among doubles the top bit is also the highest double
+    return TILES[mask.bit_length() - 1]
+
+
+def playable(hand, left_end, right_end):
+    return hand & (VALUE_MASK[left_end] | VALUE_MASK[right_end])
+
+
+def value_tiles(values):
+    """Tiles carrying any value whose bit is set in values."""
+    mask = 0
+    while values:
+        low = values & -values
+        mask |= VALUE_MASK[low.bit_length() - 1]
+        values ^= low
+    return mask
+
+
+def hand_score(mask):
+    return sum(TILE_SCORE[t] for t in iter_tiles(mask))
@@ -0,0 +1,111 @@
+"""Compact integer tiles backed by precomputed lookup tables.
+
+A tile is its id: id = high * (high + 1) // 2 + low with low <= high, so the
+double-N set is always the first tile_count(N) ids and a bigger set only
+adds ids at the end. Every question about a tile (pips, double, score,
+which tiles hold a value) is a table lookup instead of arithmetic on a
+Domino object.
+"""
+
+MAX_PIP_VALUE = 18
+
+
+def tile_count(max_value):
+    return (max_value + 1) * (max_value + 2) // 2
+
+
+def tile_id(value1, value2):
+    low, high = (value1, value2) if value1 <= value2 else (value2, value1)
+    return high * (high + 1) // 2 + low
+
+
+NUM_TILES = tile_count(MAX_PIP_VALUE)
+
+LOW_PIPS = tuple(low for high in range(MAX_PIP_VALUE + 1) for low in range(high + 1))
+HIGH_PIPS = tuple(high for high in range(MAX_PIP_VALUE + 1) for low in range(high + 1))
+
+IS_DOUBLE = tuple(LOW_PIPS[t] == HIGH_PIPS[t] for t in range(NUM_TILES))
+TILE_SCORE = tuple(LOW_PIPS[t] + HIGH_PIPS[t] for t in range(NUM_TILES))
+
+# TILES_WITH_VALUE[v] lists every tile id carrying v, lowest id first
+TILES_WITH_VALUE = tuple(
+    tuple(t for t in range(NUM_TILES) if v in (LOW_PIPS[t], HIGH_PIPS[t]))
+    for v in range(MAX_PIP_VALUE + 1)
+)
+
+
+class Tile(int):
+    """Immutable domino read as [low|high].
+
+    Drop-in for Domino where it is only read (value1, value2, get_score),
+    so AIPlayer works on tiles unchanged. flip() hands back the shared
+    FlippedTile for the same id instead of mutating anything.
+    """
+    __slots__ = ()
+
+    @property
+    def value1(self):
+        return LOW_PIPS[self]
+
+    @property
+    def value2(self):
+        return HIGH_PIPS[self]
+
+    @property
+    def is_double(self):
+        return IS_DOUBLE[self]
+
+    def get_score(self):
+        return TILE_SCORE[self]
+
+    def other_end(self, value):
+        return TILE_SCORE[self] - value
+
+    def flip(self):
+        return FLIPPED_TILES[self]
+
+    def __repr__(self):
+        return f"[{self.value1}|{self.value2}]"
+
+    def __str__(self):
+        return self.__repr__()
+
+
+class FlippedTile(Tile):
+    """The same tile read as [high|low]. Equal to (and hashes like) its Tile."""
+    __slots__ = ()
+
+    @property
+    def value1(self):
+        return HIGH_PIPS[self]
+
+    @property
+    def value2(self):
+        return LOW_PIPS[self]
+
+    def flip(self):
+        return TILES[self]
+
+
+# Every tile exists exactly once in each orientation, so nothing is ever allocated during play
+TILES = tuple(Tile(t) for t in range(NUM_TILES))
+FLIPPED_TILES = tuple(TILES[t] if IS_DOUBLE[t] else FlippedTile(t) for t in range(NUM_TILES))
+
+
+def tile_for(value1, value2):
+    """Shared tile showing value1 on the left and value2 on the right."""
+    if not (0 <= value1 <= MAX_PIP_VALUE and 0 <= value2 <= MAX_PIP_VALUE):
+        raise ValueError(f"Domino values must be between 0 and {MAX_PIP_VALUE}")
+    t = tile_id(value1, value2)
+    return TILES[t] if value1 <= value2 else FLIPPED_TILES[t]
+
+
+def from_domino(domino):
+    return tile_for(domino.value1, domino.value2)
+
+
+def deck(max_value):
+    """All tiles of the double-max_value set, in id order."""
+    if not 0 <= max_value <= MAX_PIP_VALUE:
+        raise ValueError(f"Sets go from double-0 up to double-{MAX_PIP_VALUE}")
+    return list(TILES[:tile_count(max_value)])
@@ -0,0 +1,239 @@
+"""Exact endgame search: alpha-beta over a known deal with a Zobrist transposition table.
+
+The searching seat plays against everybody else at once (a seat other than
+ours is assumed to do what is worst for us), and a line is worth +1 when
+we win the round and -1 otherwise. Candidate moves are ordered the way
+_calculate_move_score ranks them, with the table's best move in front.
+
+The table has a fixed number of slots. A slot keeps the entry that came
+from the bigger subtree, unless that entry is left over from an earlier
+solve, so long sessions never grow past table_bits.
+"""
+import random
+
+from domino_hand import VALUE_MASK, hand_score, iter_tiles
+from domino_tiles import HIGH_PIPS, IS_DOUBLE, LOW_PIPS, MAX_PIP_VALUE, NUM_TILES, TILE_SCORE
+from game_rules import lowest_pips
+from game_settings import MAX_PLAYERS
+from ismcts import PASS, decode_move, hidden_tiles, known_voids, sample_deal
+
+MAX_SEATS = MAX_PLAYERS
+MAX_PASS_COUNT = 64
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+_zobrist = random.Random(20240601)
+TILE_KEYS = [[_zobrist.getrandbits(64) for _ in range(NUM_TILES)] for _ in range(MAX_SEATS)]
+LEFT_KEYS = [_zobrist.getrandbits(64) for _ in range(MAX_PIP_VALUE + 1)]
+RIGHT_KEYS = [_zobrist.getrandbits(64) for _ in range(MAX_PIP_VALUE + 1)]
+TURN_KEYS = [_zobrist.getrandbits(64) for _ in range(MAX_SEATS)]
+ROOT_KEYS = [_zobrist.getrandbits(64) for _ in range(MAX_SEATS)]
+CONSECUTIVE_KEYS = [_zobrist.getrandbits(64) for _ in range(MAX_SEATS + 1)]
+PASS_KEYS = [[_zobrist.getrandbits(64) for _ in range(MAX_PASS_COUNT)] for _ in range(MAX_SEATS)]
+del _zobrist
+
+
+class TranspositionTable:
+    def __init__(self, table_bits=16):
+        self.size = 1 << table_bits
+        self.mask = self.size - 1
+        self.slots = [None] * self.size
+        self.generation = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def probe(self, key):
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, weight, value, flag, move):
+        index = key & self.mask
+        old = self.slots[index]
+        # Keep the more expensive result unless it is stale
+        if old is None or old[0] == key or old[5] != self.generation or weight >= old[1]:
+            self.slots[index] = (key, weight, value, flag, move, self.generation)
+            self.stores += 1
+
+
+class EndgameSolver:
+    def __init__(self, table_bits=16):
+        self.table = TranspositionTable(table_bits)
+        self.nodes = 0
+
+    def solve(self, hands, left, right, current, consecutive, passes):
+        """(value, move) for the seat to move, on a deal where every hand is known."""
+        self.table.new_search()
+        self.nodes = 0
+        self.root = current
+        self.hands = list(hands)
+        self.left = left
+        self.right = right
+        self.current = current
+        self.consecutive = consecutive
+        self.passes = list(passes)
+        self.key = self._full_key()
+        return self._search(-2, 2)
+
+    def _full_key(self):
+        # Values are from the searching seat's point of view, so it is part of the key
+        key = ROOT_KEYS[self.root] ^ TURN_KEYS[self.current] ^ CONSECUTIVE_KEYS[self.consecutive]
+        if self.left is not None:
+            key ^= LEFT_KEYS[self.left] ^ RIGHT_KEYS[self.right]
+        for seat, hand in enumerate(self.hands):
+            key ^= PASS_KEYS[seat][self.passes[seat] % MAX_PASS_COUNT]
+            for t in iter_tiles(hand):
+                key ^= TILE_KEYS[seat][t]
+        return key
+
+    def _ordered_moves(self, best_move):
+        hand = self.hands[self.current]
+        left, right = self.left, self.right
+        if left is None:
+            fits = hand
+        else:
+            fits = hand & (VALUE_MASK[left] | VALUE_MASK[right])
+        if not fits:
+            return [PASS]
+
+        scored = []
+        for t in iter_tiles(fits):
+            low, high = LOW_PIPS[t], HIGH_PIPS[t]
+            # Same ranking as AIPlayer._calculate_move_score
+            score = TILE_SCORE[t] + (5 if IS_DOUBLE[t] else 0)
+            score += (hand & (VALUE_MASK[low] | VALUE_MASK[high])).bit_count() * 2
+            if left is None:
+                scored.append((score, t * 2 + 1))
+                continue
+            if left == low or left == high:
+                scored.append((score, t * 2))
+                if left != right and (right == low or right == high):
+                    scored.append((score, t * 2 + 1))
+            else:
+                scored.append((score, t * 2 + 1))
+
+        scored.sort(reverse=True)
+        moves = [move for _, move in scored]
+        if best_move in moves:
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+        return moves
+
+    def _blocked_winner(self):
+        return lowest_pips([hand_score(hand) for hand in self.hands], self.passes)
+
+    def _search(self, alpha, beta):
+        self.nodes += 1
+        key = self.key
+        best_move = None
+        entry = self.table.probe(key)
+        if entry is not None:
+            _, _, value, flag, best_move, _ = entry
+            if flag == EXACT:
+                return value, best_move
+            if flag == LOWER and value >= beta:
+                return value, best_move
+            if flag == UPPER and value <= alpha:
+                return value, best_move
+
+        n = len(self.hands)
+        player = self.current
+        maximizing = player == self.root
+        alpha_start, beta_start = alpha, beta
+        best_value = -2 if maximizing else 2
+        chosen = None
+
+        for move in self._ordered_moves(best_move):
+            # Make the move
+            old_left, old_right, old_consecutive = self.left, self.right, self.consecutive
+            old_key = self.key
+            finished = None
+
+            if move == PASS:
+                count = self.passes[player]
+                self.key ^= PASS_KEYS[player][count % MAX_PASS_COUNT] ^ PASS_KEYS[player][(count + 1) % MAX_PASS_COUNT]
+                self.passes[player] = count + 1
+                self.consecutive += 1
+                if self.consecutive >= n:
+                    finished = self._blocked_winner()
+            else:
+                tile, at_end = move >> 1, move & 1
+                if old_left is not None:
+                    self.key ^= LEFT_KEYS[old_left] ^ RIGHT_KEYS[old_right]
+                if old_left is None:
+                    self.left, self.right = LOW_PIPS[tile], HIGH_PIPS[tile]
+                elif at_end:
+                    self.right = TILE_SCORE[tile] - old_right
+                else:
+                    self.left = TILE_SCORE[tile] - old_left
+                self.key ^= LEFT_KEYS[self.left] ^ RIGHT_KEYS[self.right]
+                self.key ^= TILE_KEYS[player][tile]
+                self.hands[player] &= ~(1 << tile)
+                self.consecutive = 0
+                if not self.hands[player]:
+                    finished = player
+
+            self.key ^= CONSECUTIVE_KEYS[old_consecutive] ^ CONSECUTIVE_KEYS[self.consecutive]
+            if finished is not None:
+                value = 1 if finished == self.root else -1
+            else:
+                self.current = (player + 1) % n
+                self.key ^= TURN_KEYS[player] ^ TURN_KEYS[self.current]
+                value, _ = self._search(alpha, beta)
+                self.current = player
+
+            # Take it back
+            if move == PASS:
+                self.passes[player] -= 1
+            else:
+                self.hands[player] |= 1 << (move >> 1)
+            self.left, self.right, self.consecutive = old_left, old_right, old_consecutive
+            self.key = old_key
+
+            if maximizing:
+                if value > best_value:
+                    best_value, chosen = value, move
+                alpha = max(alpha, value)
+            else:
+                if value < best_value:
+                    best_value, chosen = value, move
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= alpha_start:
+            flag = UPPER
+        elif best_value >= beta_start:
+            flag = LOWER
+        else:
+            flag = EXACT
+        weight = sum(hand.bit_count() for hand in self.hands)
+        self.table.store(key, weight, best_value, flag, chosen)
+        return best_value, chosen
+
+    def choose(self, engine, samples=8, rng=None):
+        """Best (tile, side) for the engine's current player.
+
+        When the other hands are not fully known every sampled deal is
+        solved exactly and the move that wins the most of them is played.
+        """
+        rng = rng or random
+        player = engine.current_player
+        hidden, sizes = hidden_tiles(engine, player)
+        opponents_tiles = sum(size for seat, size in enumerate(sizes) if seat != player)
+        known = hidden.bit_count() == opponents_tiles and engine.num_players == 2
+        voids = known_voids(engine)
+
+        votes = {}
+        for _ in range(1 if known else samples):
+            hands = sample_deal(engine, player, voids, hidden, sizes, rng)
+            value, move = self.solve(hands, engine.board.left_end, engine.board.right_end,
+                                     player, engine.consecutive_passes, engine.passes_per_player)
+            votes[move] = votes.get(move, 0) + value
+        best = max(votes, key=votes.get)
+        return decode_move(best)
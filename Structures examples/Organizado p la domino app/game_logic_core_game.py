@@ -75,13 +75,13 @@ def handle_pass(self):
     self.consecutive_passes += 1
     self.status_bar.config(text=f"{self.player_names[self.current_player]} passed their turn")
     
-    if self.consecutive_passes >= 4:
+    if self.consecutive_passes >= len(self.players):
         self.handle_deadlock()
     else:
         self.next_turn()
 
 def next_turn(self):
-    self.current_player = (self.current_player + 1) % 4
+    self.current_player = (self.current_player + 1) % len(self.players)
 
     # Handle AI turns
     if self.current_player != 0 and self.game_active:
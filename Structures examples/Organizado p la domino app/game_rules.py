@@ -0,0 +1,76 @@
+"""Scoring rules of every game mode, looked up by name.
+
+A RuleSet says what a round is worth to its winner (payout), who wins a
+blocked round (tiebreak) and what a single play scores (play_score, only
+All-Fives has one). DominoEngine looks its RuleSet up once when it is
+built and calls these functions directly, so no mode name is compared
+while a round is played. A new variant only has to register() a RuleSet
+to be played by the engine and the simulator.
+"""
+from domino_board import fives_score, round_to_five
+
+
+# Payouts: (pip_sums, remaining_pips, winner) -> points for the winner
+
+def one_point(pip_sums, remaining_pips, winner):
+    return 1
+
+
+def all_pips(pip_sums, remaining_pips, winner):
+    return remaining_pips
+
+
+def opponents_pips(pip_sums, remaining_pips, winner):
+    return remaining_pips - pip_sums[winner]
+
+
+def opponents_pips_to_five(pip_sums, remaining_pips, winner):
+    return round_to_five(remaining_pips - pip_sums[winner])
+
+
+# Tiebreaks: (pip_sums, passes) -> seat that wins a blocked round
+
+def lowest_pips(pip_sums, passes):
+    """Lowest pip sum, then fewest passes, then earliest seat, in one pass over the seats."""
+    winner = 0
+    best_sum, best_passes = pip_sums[0], passes[0]
+    for seat in range(1, len(pip_sums)):
+        pips = pip_sums[seat]
+        if pips < best_sum or (pips == best_sum and passes[seat] < best_passes):
+            winner, best_sum, best_passes = seat, pips, passes[seat]
+    return winner
+
+
+class RuleSet:
+    def __init__(self, name, payout, tiebreak=lowest_pips, play_score=None, engine_class=None):
+        self.name = name
+        self.payout = payout
+        self.tiebreak = tiebreak
+        # end_sum -> points for the player who just played, None when plays score nothing
+        self.play_score = play_score
+        # Engine that knows the board of this mode, None for DominoEngine
+        self.engine_class = engine_class
+
+    def __repr__(self):
+        return f"RuleSet({self.name!r})"
+
+
+RULE_SETS = {}
+
+
+def register(rules):
+    RULE_SETS[rules.name] = rules
+    return rules
+
+
+def get_rules(mode):
+    try:
+        return RULE_SETS[mode]
+    except KeyError:
+        raise ValueError(f"Unknown game mode: {mode}") from None
+
+
+register(RuleSet('Classic', one_point))
+register(RuleSet('Points', all_pips))
+register(RuleSet('Block', one_point))
+register(RuleSet('All-Fives', opponents_pips_to_five, play_score=fives_score))
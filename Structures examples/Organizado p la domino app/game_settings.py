@@ -1,8 +1,35 @@
+from domino_tiles import MAX_PIP_VALUE, tile_count
+
+MIN_PLAYERS = 2
+MAX_PLAYERS = 10
+
+
 class GameSettings:
     def __init__(self):
         self.num_players = 4
         self.max_piece_value = 7
         self.pieces_per_player = 8
+        # Draw from the boneyard instead of passing while it has pieces
+        self.draw_from_boneyard = False
+        # The first double opens four arms, see SpinnerBoard
+        self.spinner = False
         self.ai_delay = 1000  # milliseconds
         self.animation_speed = 500
-        self.sound_enabled = True
\ No newline at end of file
+        self.sound_enabled = True
+
+    def tile_count(self):
+        """Tiles in the double-max_piece_value set."""
+        return tile_count(self.max_piece_value)
+
+    def validate(self):
+        """Raise ValueError when the set and the deal do not go together."""
+        if not 0 <= self.max_piece_value <= MAX_PIP_VALUE:
+            raise ValueError(f"Sets go from double-0 up to double-{MAX_PIP_VALUE}")
+        if not MIN_PLAYERS <= self.num_players <= MAX_PLAYERS:
+            raise ValueError(f"The game is for {MIN_PLAYERS} to {MAX_PLAYERS} players")
+        if self.pieces_per_player < 1:
+            raise ValueError("Every player needs at least one piece")
+        dealt = self.num_players * self.pieces_per_player
+        if dealt > self.tile_count():
+            raise ValueError(f"Cannot deal {self.pieces_per_player} pieces to {self.num_players} players "
+                             f"from a double-{self.max_piece_value} set of {self.tile_count()} pieces")
@@ -5,18 +5,20 @@ class DominoGameGUI:
         self.root.geometry("800x600")
         self.game_active = True
         self.winner = None
+        self.settings = GameSettings()
         
         
         # Game state variables
         self.board = []
         self.current_player = 0
         self.players = []
-        self.player_names = ["Human Player", "Computer 1", "Computer 2", "Computer 3"]
+        self.player_names = ["Human Player"] + [f"Computer {i}" for i in range(1, self.settings.num_players)]
         self.consecutive_passes = 0
         self.scores = {name: 0 for name in self.player_names}
 
         # Initialize AI players
-        self.ai_players = [AIPlayer() for _ in range(3)]
+        # Seat 0 is the human, seat i is played by ai_players[i - 1]
+        self.ai_players = [AIPlayer() for _ in range(self.settings.num_players - 1)]
 
 
         # Create GUI elements
@@ -114,21 +116,20 @@ class DominoGameGUI:
         
         # Generate dominoes
         try:
-            dominoes = [Domino(i, j) for i in range(8) for j in range(i, 8)]
+            self.settings.validate()
+            values = self.settings.max_piece_value + 1
+            dominoes = [Domino(i, j) for i in range(values) for j in range(i, values)]
             random.shuffle(dominoes)
 
             # Distribute pieces
-            self.players = [
-                dominoes[:8],
-                dominoes[8:16],
-                dominoes[16:24],
-                dominoes[24:32]
-            ]
+            per_player = self.settings.pieces_per_player
+            self.players = [dominoes[i * per_player:(i + 1) * per_player]
+                            for i in range(len(self.player_names))]
             
             # Determine starting player based on highest double
             self.current_player = self._find_starting_player()
             
-            self.remaining_pieces = dominoes[32:]
+            self.remaining_pieces = dominoes[len(self.players) * per_player:]
             self.board = []  # Start with empty board
             
             self.update_display()
@@ -0,0 +1,302 @@
+"""Determinized information-set Monte Carlo tree search for the "expert" AI.
+
+Every iteration deals the unseen tiles to the opponents in a way that fits
+what has been seen (tiles on the board, hand sizes, values a player passed
+on), walks the shared tree choosing among the moves that exist in that
+deal, and finishes the round with quick random play.
+
+Moves are ints: tile * 2 + 1 for the end of the board, tile * 2 for the
+start, PASS for a pass. The first tile of a round always counts as 'end',
+the side DominoBoard.place reports for it.
+"""
+import math
+import random
+import time
+
+from domino_hand import VALUE_MASK, hand_score, hand_tiles, iter_tiles
+from domino_tiles import HIGH_PIPS, LOW_PIPS, TILE_SCORE
+from game_rules import lowest_pips
+
+PASS = -1
+
+
+def encode_move(tile, side):
+    if tile is None:
+        return PASS
+    return tile * 2 + (1 if side == 'end' else 0)
+
+
+def decode_move(move):
+    if move == PASS:
+        return None, None
+    tile, at_end = divmod(move, 2)
+    return tile, 'end' if at_end else 'start'
+
+
+def known_voids(engine):
+    """Tile mask per player of the values they passed on."""
+    return engine.knowledge.void_tiles
+
+
+def hidden_tiles(engine, player):
+    """Tiles the player cannot see, and how many tiles every hand holds."""
+    unseen = engine.knowledge.hidden_from(engine.players[player])
+    sizes = [hand.bit_count() for hand in engine.players]
+    return unseen, sizes
+
+
+def sample_deal(engine, player, voids, hidden, sizes, rng):
+    """Hands for every seat: the player's own, and a guess for the others that fits what was seen."""
+    opponents = [p for p in range(engine.num_players) if p != player]
+    # The most restricted players pick first
+    opponents.sort(key=lambda p: -voids[p].bit_count())
+    pool = hand_tiles(hidden)
+
+    for _ in range(20):
+        rng.shuffle(pool)
+        hands = list(engine.players)
+        remaining = pool
+        for p in opponents:
+            allowed = [t for t in remaining if not voids[p] >> t & 1]
+            if len(allowed) < sizes[p]:
+                break
+            taken = 0
+            for t in allowed[:sizes[p]]:
+                taken |= 1 << t
+            hands[p] = taken
+            remaining = [t for t in remaining if not taken >> t & 1]
+        else:
+            return hands
+
+    # No consistent deal found quickly, fall back to ignoring the passes
+    hands = list(engine.players)
+    start = 0
+    for p in opponents:
+        hands[p] = sum(1 << t for t in pool[start:start + sizes[p]])
+        start += sizes[p]
+    return hands
+
+
+class Playout:
+    """Bare round state used inside the search, the same rules as DominoEngine."""
+    __slots__ = ('hands', 'left', 'right', 'current', 'consecutive', 'passes', 'winner', 'boneyard')
+
+    def __init__(self, hands, left, right, current, consecutive, passes, boneyard=None):
+        self.hands = hands
+        self.left = left
+        self.right = right
+        self.current = current
+        self.consecutive = consecutive
+        self.passes = passes
+        self.winner = None
+        # Tiles left to draw when playing with the boneyard, popped from the back
+        self.boneyard = boneyard
+
+    @classmethod
+    def from_engine(cls, engine, hands, boneyard=None):
+        """The engine's position with the given hands, sharing no list with the engine."""
+        return cls(list(hands), engine.board.left_end, engine.board.right_end, engine.current_player,
+                   engine.consecutive_passes, list(engine.passes_per_player), boneyard)
+
+    def clone(self):
+        state = Playout(list(self.hands), self.left, self.right, self.current, self.consecutive,
+                        list(self.passes), None if self.boneyard is None else list(self.boneyard))
+        state.winner = self.winner
+        return state
+
+    def moves(self):
+        hand = self.hands[self.current]
+        if self.left is None:
+            return [t * 2 + 1 for t in iter_tiles(hand)]
+
+        left, right = self.left, self.right
+        ends = VALUE_MASK[left] | VALUE_MASK[right]
+        fits = hand & ends
+        if not fits and self.boneyard:
+            # Draw until something fits, only the new tile needs checking
+            while self.boneyard and not fits:
+                tile = self.boneyard.pop()
+                hand |= 1 << tile
+                fits = ends >> tile & 1 and 1 << tile
+            self.hands[self.current] = hand
+        if not fits:
+            return [PASS]
+
+        moves = []
+        for t in iter_tiles(fits):
+            low, high = LOW_PIPS[t], HIGH_PIPS[t]
+            if left == low or left == high:
+                moves.append(t * 2)
+                # A second option only when the other end really leads somewhere else
+                if left != right and (right == low or right == high):
+                    moves.append(t * 2 + 1)
+            else:
+                moves.append(t * 2 + 1)
+        return moves
+
+    def apply(self, move):
+        n = len(self.hands)
+        player = self.current
+
+        if move == PASS:
+            self.consecutive += 1
+            self.passes[player] += 1
+            if self.consecutive >= n:
+                self.winner = self.blocked_winner()
+                return
+        else:
+            tile, at_end = move >> 1, move & 1
+            if self.left is None:
+                self.left, self.right = LOW_PIPS[tile], HIGH_PIPS[tile]
+            elif at_end:
+                self.right = TILE_SCORE[tile] - self.right
+            else:
+                self.left = TILE_SCORE[tile] - self.left
+            self.hands[player] &= ~(1 << tile)
+            self.consecutive = 0
+            if not self.hands[player]:
+                self.winner = player
+                return
+
+        self.current = (player + 1) % n
+
+    def blocked_winner(self):
+        return lowest_pips([hand_score(hand) for hand in self.hands], self.passes)
+
+    def play_out(self, rng):
+        while self.winner is None:
+            self.apply(rng.choice(self.moves()))
+        return self.winner
+
+
+class Node:
+    __slots__ = ('move', 'parent', 'player', 'children', 'visits', 'wins', 'available')
+
+    def __init__(self, move=None, parent=None, player=None):
+        self.move = move
+        self.parent = parent
+        # Seat that made the move leading here, credited when it wins
+        self.player = player
+        self.children = {}
+        self.visits = 0
+        self.wins = 0.0
+        self.available = 0
+
+
+class ISMCTS:
+    def __init__(self, time_budget=1.0, max_iterations=None, exploration=0.7, rng=None):
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.exploration = exploration
+        self.rng = rng or random.Random()
+        self.iterations = 0
+
+        # Tree kept between turns: the round it belongs to and how much history it has seen
+        self.root = None
+        self.root_round = None
+        self.root_history = 0
+
+    def choose(self, engine):
+        """Best (tile, side) for the engine's current player, (None, None) to pass.
+
+        Returns None when the search never got to try a legal move, the
+        caller then falls back to its own choice.
+        """
+        player = engine.current_player
+        root = self._reuse_root(engine)
+
+        moves = Playout.from_engine(engine, engine.players).moves()
+        if len(moves) == 1:
+            # Nothing to think about, but keep the tree for next turn
+            self._keep(root.children.get(moves[0]), engine)
+            return decode_move(moves[0])
+
+        voids = known_voids(engine)
+        hidden, sizes = hidden_tiles(engine, player)
+
+        deadline = time.perf_counter() + self.time_budget
+        self.iterations = 0
+        while True:
+            self._iterate(root, engine, player, voids, hidden, sizes)
+            self.iterations += 1
+            if self.max_iterations is not None and self.iterations >= self.max_iterations:
+                break
+            if time.perf_counter() >= deadline:
+                break
+
+        # A reused tree or a deal that drew from the boneyard can hold moves we cannot make now
+        legal = set(moves)
+        tried = [node for move, node in root.children.items() if move in legal and node.visits]
+        if not tried:
+            self.root = None
+            return None
+        best = max(tried, key=lambda node: node.visits)
+        self._keep(best, engine)
+        return decode_move(best.move)
+
+    def _keep(self, node, engine):
+        # node is the position right after our move, one entry past the current history
+        self.root = node
+        self.root_round = engine.round_number
+        self.root_history = len(engine.history) + 1
+
+    def _reuse_root(self, engine):
+        node = self.root
+        if node is None or self.root_round != engine.round_number or self.root_history > len(engine.history):
+            return Node()
+
+        # Follow what everybody did since our last move down the old tree
+        for _, tile, side in engine.history[self.root_history:]:
+            node = node.children.get(encode_move(tile, side))
+            if node is None:
+                return Node()
+        node.parent = None
+        return node
+
+    def _iterate(self, root, engine, player, voids, hidden, sizes):
+        hands = sample_deal(engine, player, voids, hidden, sizes, self.rng)
+        boneyard = None
+        if engine.settings.draw_from_boneyard and engine.remaining_pieces:
+            # Whatever the opponents were not dealt is still in the boneyard
+            dealt = 0
+            for hand in hands:
+                dealt |= hand
+            boneyard = hand_tiles(hidden & ~dealt)
+            self.rng.shuffle(boneyard)
+        state = Playout.from_engine(engine, hands, boneyard)
+        node = root
+
+        # Selection among the moves that exist in this deal
+        while state.winner is None:
+            moves = state.moves()
+            untried = [m for m in moves if m not in node.children]
+            if untried:
+                move = self.rng.choice(untried)
+                child = Node(move, node, state.current)
+                node.children[move] = child
+                for m in moves:
+                    if m in node.children:
+                        node.children[m].available += 1
+                state.apply(move)
+                node = child
+                break
+
+            # UCB over the children that are legal here, weighed by how often they were
+            best, best_value = None, -1.0
+            for m in moves:
+                child = node.children[m]
+                child.available += 1
+                value = child.wins / child.visits + self.exploration * math.sqrt(
+                    math.log(child.available) / child.visits)
+                if value > best_value:
+                    best, best_value = child, value
+            state.apply(best.move)
+            node = best
+
+        winner = state.play_out(self.rng)
+
+        while node is not None:
+            node.visits += 1
+            if node.player == winner:
+                node.wins += 1
+            node = node.parent
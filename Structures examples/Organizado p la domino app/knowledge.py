@@ -0,0 +1,54 @@
+from domino_hand import VALUE_MASK, set_mask, value_tiles
+from domino_tiles import HIGH_PIPS, LOW_PIPS
+
+
+class KnowledgeTracker:
+    """What every seat can deduce from the table, kept up to date move by move.
+
+    A player who passes holds no open-end number, so each pass adds
+    the open ends to that player's void_values (bit v set means "has no v") and
+    void_tiles (every tile carrying a void value). Drawing from the
+    boneyard keeps only the ends drawn against, see on_draw. unplayed[v] counts the
+    tiles with v that are not on the board yet, and unseen_mask has a bit
+    for every tile not on the board. All updates are O(1).
+    """
+
+    def __init__(self, num_players, max_value):
+        self.reset(num_players, max_value)
+
+    def reset(self, num_players, max_value):
+        self.max_value = max_value
+        self.void_values = [0] * num_players
+        self.void_tiles = [0] * num_players
+        # Each value sits on max_value + 1 tiles of the set
+        self.unplayed = [max_value + 1] * (max_value + 1)
+        self.unseen_mask = set_mask(max_value)
+
+    def on_play(self, player, tile):
+        low, high = LOW_PIPS[tile], HIGH_PIPS[tile]
+        self.unplayed[low] -= 1
+        if high != low:
+            self.unplayed[high] -= 1
+        self.unseen_mask &= ~(1 << tile)
+
+    def on_pass(self, player, open_values):
+        """open_values has a bit for every open end value, see DominoBoard.open_mask."""
+        self.void_values[player] |= open_values
+        self.void_tiles[player] |= value_tiles(open_values)
+
+    def on_draw(self, player, open_values):
+        # The drawn tiles can bring back values the player passed on before,
+        # only the ends they drew against are known to be missing now
+        self.void_values[player] = open_values
+        self.void_tiles[player] = value_tiles(open_values)
+
+    def is_void(self, player, value):
+        return bool(self.void_values[player] >> value & 1)
+
+    def hidden_with_value(self, value, hand):
+        """Tiles with value that neither the board nor this hand shows."""
+        return self.unplayed[value] - (hand & VALUE_MASK[value]).bit_count()
+
+    def hidden_from(self, hand):
+        """Tiles the owner of hand has not seen."""
+        return self.unseen_mask & ~hand
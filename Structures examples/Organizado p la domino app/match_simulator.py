@@ -0,0 +1,181 @@
+"""Whole matches to target_score, AIPlayer against AIPlayer on every core.
+
+    python match_simulator.py --seats hard medium medium medium --mode Points --target 100 150 --precision 0.02
+
+For every target it estimates each seat's chance of winning the match,
+with a 95% Wilson interval, and the number of rounds a match takes with
+its variance. Batches of matches are played in parallel and looked at in
+order; as soon as every seat's interval is within --precision it stops,
+so the same seed gives the same answer on any number of workers.
+"""
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game_rules import RULE_SETS
+from simulator import DIFFICULTIES, make_engine, make_settings
+import mexican_train  # registers the Mexican Train rules
+
+BATCH_MATCHES = 20
+# Normal quantile of the 95% intervals
+Z = 1.96
+
+
+class MatchStats:
+    def __init__(self, num_players):
+        self.matches = 0
+        self.wins = [0] * num_players
+        # Sums of rounds and squared rounds per match, enough for mean and variance
+        self.rounds = 0
+        self.rounds_squared = 0
+
+    def add(self, winner, rounds):
+        self.matches += 1
+        self.wins[winner] += 1
+        self.rounds += rounds
+        self.rounds_squared += rounds * rounds
+
+    def merge(self, other):
+        self.matches += other.matches
+        self.rounds += other.rounds
+        self.rounds_squared += other.rounds_squared
+        for seat in range(len(self.wins)):
+            self.wins[seat] += other.wins[seat]
+
+    def win_interval(self, seat, z=Z):
+        """(low, high) Wilson interval of the seat's match win probability."""
+        n = self.matches
+        if not n:
+            return 0.0, 1.0
+        p = self.wins[seat] / n
+        centre = (p + z * z / (2 * n)) / (1 + z * z / n)
+        half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return centre - half, centre + half
+
+    def widest_interval(self):
+        """Half width of the loosest seat interval, what early stopping looks at."""
+        return max((high - low) / 2 for low, high in map(self.win_interval, range(len(self.wins))))
+
+    def mean_rounds(self):
+        return self.rounds / self.matches if self.matches else 0.0
+
+    def rounds_variance(self):
+        n = self.matches
+        if n < 2:
+            return 0.0
+        return (self.rounds_squared - self.rounds * self.rounds / n) / (n - 1)
+
+    def rounds_interval(self, z=Z):
+        half = z * math.sqrt(self.rounds_variance() / self.matches) if self.matches else 0.0
+        mean = self.mean_rounds()
+        return mean - half, mean + half
+
+    def report(self, seats):
+        low, high = self.rounds_interval()
+        lines = [
+            f"Matches played: {self.matches}",
+            f"Rounds per match: {self.mean_rounds():.2f} (variance {self.rounds_variance():.2f}, "
+            f"95% interval {low:.2f}-{high:.2f})",
+            "",
+            f"{'Seat':<6}{'AI':<8}{'Match wins':>12}{'95% interval':>18}",
+        ]
+        for seat, difficulty in enumerate(seats):
+            low, high = self.win_interval(seat)
+            lines.append(f"{seat:<6}{difficulty:<8}{self.wins[seat] / max(self.matches, 1):>12.1%}"
+                         f"{f'{low:.1%} - {high:.1%}':>18}")
+        return "\n".join(lines)
+
+
+def run_match_batch(seats, mode, matches, seed, target_score, max_piece_value=None, pieces_per_player=None,
+                    ai_options=None, draw_from_boneyard=False, spinner=False):
+    """Play a batch of matches in one process. Must stay top level so the pool can pickle it."""
+    settings = make_settings(len(seats), max_piece_value, pieces_per_player, draw_from_boneyard, spinner)
+    engine = make_engine(seats, mode, settings, target_score, ai_options, seed)
+
+    stats = MatchStats(len(seats))
+    for _ in range(matches):
+        winner = engine.play_match()
+        stats.add(winner, engine.round_number - engine.match_start)
+    return stats
+
+
+def simulate_matches(seats, mode='Points', target_score=100, max_matches=10000, seed=0, workers=None,
+                     precision=0.02, max_piece_value=None, pieces_per_player=None, ai_options=None,
+                     draw_from_boneyard=False, spinner=False):
+    """MatchStats of up to max_matches matches, fewer once every win interval is within precision."""
+    workers = workers or os.cpu_count() or 1
+    sizes = [min(BATCH_MATCHES, max_matches - start) for start in range(0, max_matches, BATCH_MATCHES)]
+    args = (max_piece_value, pieces_per_player, ai_options, draw_from_boneyard, spinner)
+
+    def batch(i):
+        return (seats, mode, sizes[i], seed * 1000003 + i, target_score) + args
+
+    stats = MatchStats(len(seats))
+    if workers == 1:
+        for i in range(len(sizes)):
+            stats.merge(run_match_batch(*batch(i)))
+            if stats.widest_interval() <= precision:
+                break
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep every worker busy but merge in batch order, the stopping point does not depend on timing
+        pending = [pool.submit(run_match_batch, *batch(i)) for i in range(min(workers * 2, len(sizes)))]
+        submitted = len(pending)
+        while pending:
+            stats.merge(pending.pop(0).result())
+            if stats.widest_interval() <= precision:
+                for future in pending:
+                    future.cancel()
+                break
+            if submitted < len(sizes):
+                pending.append(pool.submit(run_match_batch, *batch(submitted)))
+                submitted += 1
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate match win chances and match length for a lineup of AIs.")
+    parser.add_argument('--seats', nargs='+', choices=DIFFICULTIES, default=['hard', 'medium', 'medium', 'medium'],
+                        help="difficulty of each seat, one per player")
+    parser.add_argument('--mode', choices=tuple(RULE_SETS), default='Points')
+    parser.add_argument('--target', type=int, nargs='+', default=[100],
+                        help="target scores to try, each gets its own estimate")
+    parser.add_argument('--matches', type=int, default=10000, help="most matches to play per target")
+    parser.add_argument('--precision', type=float, default=0.02,
+                        help="stop once every 95%% win interval is at most this far from its centre")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help="processes to use (default: all cores)")
+    parser.add_argument('--max-piece-value', type=int, default=None, help="highest pip of the set")
+    parser.add_argument('--pieces-per-player', type=int, default=None)
+    parser.add_argument('--search-time', type=float, default=None,
+                        help="seconds an expert seat searches per move (default: GameSettings.ai_delay)")
+    parser.add_argument('--draw', action='store_true',
+                        help="draw from the boneyard instead of passing while it has pieces")
+    parser.add_argument('--spinner', action='store_true', help="the first double opens four arms")
+    args = parser.parse_args(argv)
+    if args.mode == mexican_train.MEXICAN_TRAIN:
+        # Checked here, the workers would only raise it one batch at a time
+        try:
+            mexican_train.check_settings(make_settings(len(args.seats), args.max_piece_value,
+                                                       args.pieces_per_player, args.draw, args.spinner))
+        except ValueError as e:
+            parser.error(str(e))
+
+    ai_options = {'time_budget': args.search_time}
+    for target in args.target:
+        start = time.perf_counter()
+        stats = simulate_matches(args.seats, args.mode, target, args.matches, args.seed, args.workers,
+                                 args.precision, args.max_piece_value, args.pieces_per_player, ai_options,
+                                 args.draw, args.spinner)
+        elapsed = time.perf_counter() - start
+
+        print(f"Mode: {args.mode}   Target: {target}   Seed: {args.seed}")
+        print(stats.report(args.seats))
+        print(f"\n{elapsed:.2f}s ({stats.matches / elapsed:.0f} matches/s)\n")
+
+
+if __name__ == "__main__":
+    main()
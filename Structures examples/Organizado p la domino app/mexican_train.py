@@ -0,0 +1,97 @@
+"""Mexican Train on top of DominoEngine.
+
+Each round a hub double goes in the middle: the highest double in the
+first round, one lower every round after. Every seat has a private train
+from it and there is a public Mexican train. A seat plays one tile on
+its own train, the Mexican train or a train marked open. A seat that
+cannot play draws one tile and plays it if it fits. Otherwise it passes
+and its train is marked open until it plays on it again. Doubles do not
+have to be covered.
+"""
+from domino_board import TrainBoard
+from domino_engine import DominoEngine
+from domino_tiles import tile_id
+from game_rules import RuleSet, opponents_pips, register
+
+MEXICAN_TRAIN = 'Mexican Train'
+
+
+def check_settings(settings):
+    """Raise ValueError for settings Mexican Train cannot play or would ignore."""
+    if settings.num_players * settings.pieces_per_player >= settings.tile_count():
+        raise ValueError("The hub double has to stay out of the deal")
+    if settings.spinner:
+        raise ValueError("Mexican Train plays on trains, there is no spinner")
+    if settings.draw_from_boneyard:
+        raise ValueError("Mexican Train always draws one tile before passing, turn boneyard draws off")
+
+
+class MexicanTrainEngine(DominoEngine):
+    def __init__(self, settings=None, ai_players=None, target_score=100, seed=None):
+        super().__init__(settings, MEXICAN_TRAIN, ai_players, target_score, seed)
+        check_settings(self.settings)
+        self.board = TrainBoard(self.settings.max_piece_value, self.num_players)
+        self.hub = None
+        self.drew = False
+
+    def _deck(self):
+        # The hub moves one double down every round of the match
+        max_value = self.settings.max_piece_value
+        value = max_value - (self.round_number - self.match_start - 1) % (max_value + 1)
+        self.hub = tile_id(value, value)
+        dominoes = super()._deck()
+        dominoes.remove(self.hub)
+        return dominoes
+
+    def new_round(self, round_seed=None):
+        super().new_round(round_seed)
+        self.board.start(self.hub)
+        self.knowledge.on_play(None, self.hub)
+
+    def play(self, tile, position=None):
+        """Play a tile of the current player on a train (position), the first one allowed when None."""
+        player = self.current_player
+        if position is None:
+            trains = self.board.positions(tile, player)
+            if not trains:
+                return False
+            position = trains[0]
+        elif not self.board.fits(tile, position, player):
+            return False
+
+        if not super().play(tile, position):
+            return False
+        if position == player:
+            self.board.set_open(player, False)
+        return True
+
+    def pass_turn(self):
+        if not self.game_active:
+            return
+        # A draw or a newly opened train gives everybody something new to
+        # look at, so only passes after it count towards a blocked game
+        if self.drew or not self.board.open_trains[self.current_player]:
+            self.consecutive_passes = 0
+        self.board.set_open(self.current_player, True)
+        super().pass_turn()
+
+    def draw_for_turn(self):
+        """Draw one tile when nothing can be played."""
+        player = self.current_player
+        self.drew = False
+        if not self.has_valid_move() and self.remaining_pieces:
+            self.take_from_boneyard(player)
+            self.knowledge.on_draw(player, self.board.open_values(player))
+            self.drew = True
+
+    def step(self):
+        """Let the AI sitting in the current seat take its turn, drawing once if it has to."""
+        player = self.current_player
+        self.draw_for_turn()
+        tile, train = self.ai_players[player].choose_play(self.players[player], None, None, self)
+        if tile is None or not self.play(tile, train):
+            self.pass_turn()
+
+
+# The winner collects the pips left in the other hands
+register(RuleSet(MEXICAN_TRAIN, opponents_pips, engine_class=MexicanTrainEngine))
@@ -0,0 +1,47 @@
+from collections import OrderedDict
+
+
+class MoveCache:
+    """Bounded LRU of evaluated positions.
+
+    Keys are (hand bitmask, left end, right end, ...) tuples, so the same
+    hand in front of the same board is scored once no matter which seat
+    or which round it shows up in. hits/misses tell how well it works.
+    """
+
+    def __init__(self, maxsize=65536):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Cached value for key, or None on a miss."""
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __repr__(self):
+        return f"MoveCache({len(self.entries)}/{self.maxsize}, hits={self.hits}, misses={self.misses})"
@@ -0,0 +1,162 @@
+"""Record rounds and play them back exactly.
+
+A RoundRecord holds everything that decides a round: the mode, the
+settings that change the game, the round's deal seed, who led and every
+move. replay() deals again from the seed, makes the recorded moves with
+the engine's own rules (draws follow from the seed, so they are not
+recorded) and checks the final state_hash against the recorded one.
+
+    python replay.py --record rounds.jsonl --rounds 200 --seed 7 --seats hard medium medium medium
+    python replay.py rounds.jsonl
+
+The first line plays and saves rounds, the second checks every saved
+round still plays out the same, which is what benchmark runs rely on.
+"""
+import argparse
+import json
+
+from domino_engine import DominoEngine
+from game_rules import RULE_SETS, get_rules
+from game_settings import GameSettings
+import mexican_train  # registers the Mexican Train rules
+
+# GameSettings fields that change how a round plays
+RECORDED_SETTINGS = ('num_players', 'max_piece_value', 'pieces_per_player', 'draw_from_boneyard', 'spinner')
+
+
+class RoundRecord:
+    def __init__(self, mode, settings, round_seed, first_player, moves, state_hash, match_round=1):
+        self.mode = mode
+        # {field: value} for RECORDED_SETTINGS
+        self.settings = settings
+        self.round_seed = round_seed
+        self.first_player = first_player
+        # (player, tile, side) as in DominoEngine.history
+        self.moves = moves
+        self.state_hash = state_hash
+        # Round of the match, Mexican Train picks its hub double from it
+        self.match_round = match_round
+
+    @classmethod
+    def from_engine(cls, engine):
+        """Record of the engine's current round, usually right after play_round()."""
+        settings = {name: getattr(engine.settings, name) for name in RECORDED_SETTINGS}
+        return cls(engine.current_mode, settings, engine.round_seed, engine.first_player,
+                   list(engine.history), engine.state_hash(), engine.round_number - engine.match_start)
+
+    def to_dict(self):
+        return {
+            'mode': self.mode,
+            'settings': self.settings,
+            'round_seed': self.round_seed,
+            'first_player': self.first_player,
+            'moves': [list(move) for move in self.moves],
+            'state_hash': self.state_hash,
+            'match_round': self.match_round,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['mode'], data['settings'], data['round_seed'], data['first_player'],
+                   [tuple(move) for move in data['moves']], data['state_hash'], data['match_round'])
+
+    def __repr__(self):
+        return f"RoundRecord({self.mode!r}, seed={self.round_seed}, moves={len(self.moves)})"
+
+
+def replay(record):
+    """Play the recorded round again and return the engine.
+
+    Raises ValueError when a move is out of turn or illegal, or when the
+    round ends up anywhere but the recorded state.
+    """
+    settings = GameSettings()
+    for name, value in record.settings.items():
+        setattr(settings, name, value)
+    engine_class = get_rules(record.mode).engine_class
+    if engine_class is None:
+        engine = DominoEngine(settings, mode=record.mode)
+    else:
+        engine = engine_class(settings)
+
+    engine.match_start = 1 - record.match_round
+    engine.new_round(record.round_seed)
+    engine.current_player = engine.first_player = record.first_player
+
+    for turn, (player, tile, side) in enumerate(record.moves):
+        if not engine.game_active:
+            raise ValueError(f"Move {turn} comes after the round ended")
+        if player != engine.current_player:
+            raise ValueError(f"Move {turn} is by seat {player}, but it is seat {engine.current_player}'s turn")
+        engine.draw_for_turn()
+        if tile is None:
+            engine.pass_turn()
+        elif not engine.play(tile, side):
+            raise ValueError(f"Move {turn} (tile {tile} at {side}) is not legal")
+
+    if engine.state_hash() != record.state_hash:
+        raise ValueError("Replay does not end in the recorded state")
+    return engine
+
+
+def record_rounds(engine, rounds):
+    """Play rounds on the engine and return a RoundRecord of each."""
+    records = []
+    for _ in range(rounds):
+        engine.play_round()
+        records.append(RoundRecord.from_engine(engine))
+    return records
+
+
+def save_records(path, records):
+    with open(path, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record.to_dict()) + "\n")
+
+
+def load_records(path):
+    with open(path) as f:
+        return [RoundRecord.from_dict(json.loads(line)) for line in f if line.strip()]
+
+
+def main(argv=None):
+    # Imported here, the simulator is only needed to record
+    from simulator import DIFFICULTIES, make_engine, make_settings
+
+    parser = argparse.ArgumentParser(description="Record rounds to a file, or check that recorded rounds replay exactly.")
+    parser.add_argument('path', help="JSON lines file of RoundRecords")
+    parser.add_argument('--record', action='store_true', help="play rounds and write them to path instead of checking it")
+    parser.add_argument('--rounds', type=int, default=100)
+    parser.add_argument('--seats', nargs='+', choices=DIFFICULTIES, default=['hard', 'medium', 'medium', 'medium'],
+                        help="difficulty of each seat, one per player")
+    parser.add_argument('--mode', choices=tuple(RULE_SETS), default='Classic')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--draw', action='store_true',
+                        help="draw from the boneyard instead of passing while it has pieces")
+    parser.add_argument('--spinner', action='store_true', help="the first double opens four arms")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        settings = make_settings(len(args.seats), draw_from_boneyard=args.draw, spinner=args.spinner)
+        # Expert seats search a fixed number of iterations, a time budget would not repeat
+        engine = make_engine(args.seats, args.mode, settings, ai_options={'max_iterations': 200}, seed=args.seed)
+        records = record_rounds(engine, args.rounds)
+        save_records(args.path, records)
+        print(f"Recorded {len(records)} rounds to {args.path}")
+        return
+
+    records = load_records(args.path)
+    failed = 0
+    for index, record in enumerate(records):
+        try:
+            replay(record)
+        except ValueError as error:
+            failed += 1
+            print(f"Round {index}: {error}")
+    print(f"{len(records) - failed} of {len(records)} rounds replayed exactly")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""Self-play simulator: AIPlayer against AIPlayer on every core.
+
+    python simulator.py --rounds 100000 --seats hard medium medium medium --mode Points --seed 7
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ai_player import AIPlayer
+from domino_engine import DominoEngine
+from game_rules import RULE_SETS, get_rules
+from game_settings import GameSettings
+import mexican_train  # registers the Mexican Train rules
+from move_cache import MoveCache
+
+DIFFICULTIES = ('easy', 'medium', 'hard', 'expert')
+BATCH_ROUNDS = 500
+
+
+class SimulationStats:
+    def __init__(self, num_players):
+        self.rounds = 0
+        self.wins = [0] * num_players
+        self.points = [0] * num_players
+        self.passes = [0] * num_players
+        self.turns = 0
+        self.blocked = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add(self, result):
+        self.rounds += 1
+        self.wins[result.winner] += 1
+        self.points[result.winner] += result.points
+        self.turns += result.turns
+        if result.blocked:
+            self.blocked += 1
+        for seat, passes in enumerate(result.passes_per_player):
+            self.passes[seat] += passes
+        if result.move_points:
+            for seat, points in enumerate(result.move_points):
+                self.points[seat] += points
+
+    def merge(self, other):
+        self.rounds += other.rounds
+        self.turns += other.turns
+        self.blocked += other.blocked
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+        for seat in range(len(self.wins)):
+            self.wins[seat] += other.wins[seat]
+            self.points[seat] += other.points[seat]
+            self.passes[seat] += other.passes[seat]
+
+    def report(self, seats):
+        rounds = max(self.rounds, 1)
+        lines = [
+            f"Rounds played: {self.rounds}",
+            f"Average round length: {self.turns / rounds:.2f} turns",
+            f"Blocked rounds: {self.blocked / rounds:.1%}",
+        ]
+        lookups = self.cache_hits + self.cache_misses
+        if lookups:
+            lines.append(f"Move cache: {self.cache_hits} hits, {self.cache_misses} misses "
+                         f"({self.cache_hits / lookups:.1%} hit rate)")
+        lines += [
+            "",
+            f"{'Seat':<6}{'AI':<8}{'Win rate':>10}{'Points/round':>14}{'Passes/round':>14}",
+        ]
+        for seat, difficulty in enumerate(seats):
+            lines.append(f"{seat:<6}{difficulty:<8}{self.wins[seat] / rounds:>10.1%}"
+                         f"{self.points[seat] / rounds:>14.2f}{self.passes[seat] / rounds:>14.2f}")
+        return "\n".join(lines)
+
+
+def make_settings(num_players, max_piece_value=None, pieces_per_player=None, draw_from_boneyard=False,
+                  spinner=False):
+    settings = GameSettings()
+    settings.draw_from_boneyard = draw_from_boneyard
+    settings.spinner = spinner
+    settings.num_players = num_players
+    if max_piece_value is not None:
+        settings.max_piece_value = max_piece_value
+    if pieces_per_player is not None:
+        settings.pieces_per_player = pieces_per_player
+    return settings
+
+
+def make_engine(seats, mode, settings, target_score=100, ai_options=None, seed=None):
+    """Engine for mode with one AIPlayer of the given difficulty per seat.
+
+    ai_options are extra AIPlayer keyword arguments given to every seat;
+    move_cache_size among them gives all seats one shared MoveCache.
+    The seed makes the engine's deals and AIs repeat, see DominoEngine.
+    """
+    ai_options = dict(ai_options or {})
+    cache_size = ai_options.pop('move_cache_size', None)
+    cache = MoveCache(cache_size) if cache_size else None
+    ai_players = [AIPlayer(d, move_cache=cache, **ai_options) for d in seats]
+    engine_class = get_rules(mode).engine_class
+    if engine_class is None:
+        return DominoEngine(settings, mode=mode, ai_players=ai_players, target_score=target_score, seed=seed)
+    return engine_class(settings, ai_players=ai_players, target_score=target_score, seed=seed)
+
+
+def run_batch(seats, mode, rounds, seed, max_piece_value=None, pieces_per_player=None, ai_options=None,
+              draw_from_boneyard=False, spinner=False):
+    """Play a batch of rounds in one process. Must stay top level so the pool can pickle it.
+
+    ai_options are passed on to make_engine.
+    """
+    settings = make_settings(len(seats), max_piece_value, pieces_per_player, draw_from_boneyard, spinner)
+    engine = make_engine(seats, mode, settings, ai_options=ai_options, seed=seed)
+    cache = engine.ai_players[0].move_cache
+
+    stats = SimulationStats(len(seats))
+    for _ in range(rounds):
+        stats.add(engine.play_round())
+    if cache is not None:
+        stats.cache_hits, stats.cache_misses = cache.hits, cache.misses
+    return stats
+
+
+def simulate(seats, mode='Classic', rounds=10000, seed=0, workers=None,
+             max_piece_value=None, pieces_per_player=None, ai_options=None, draw_from_boneyard=False,
+             spinner=False):
+    workers = workers or os.cpu_count() or 1
+    # Batches have a fixed size so the same seed gives the same games on any number of workers
+    sizes = [min(BATCH_ROUNDS, rounds - start) for start in range(0, rounds, BATCH_ROUNDS)]
+
+    stats = SimulationStats(len(seats))
+    if workers == 1:
+        for i, size in enumerate(sizes):
+            stats.merge(run_batch(seats, mode, size, seed * 1000003 + i,
+                                  max_piece_value, pieces_per_player, ai_options, draw_from_boneyard, spinner))
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_batch, seats, mode, size, seed * 1000003 + i,
+                               max_piece_value, pieces_per_player, ai_options, draw_from_boneyard, spinner)
+                   for i, size in enumerate(sizes)]
+        for future in futures:
+            stats.merge(future.result())
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play AIPlayer against AIPlayer and report the results.")
+    parser.add_argument('--rounds', type=int, default=10000, help="number of rounds to play")
+    parser.add_argument('--seats', nargs='+', choices=DIFFICULTIES, default=['hard', 'medium', 'medium', 'medium'],
+                        help="difficulty of each seat, one per player")
+    parser.add_argument('--mode', choices=tuple(RULE_SETS), default='Classic')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help="processes to use (default: all cores)")
+    parser.add_argument('--max-piece-value', type=int, default=None, help="highest pip of the set")
+    parser.add_argument('--pieces-per-player', type=int, default=None)
+    parser.add_argument('--search-time', type=float, default=None,
+                        help="seconds an expert seat searches per move (default: GameSettings.ai_delay)")
+    parser.add_argument('--endgame-threshold', type=int, default=None,
+                        help="tiles left in all hands at which hard/expert seats solve the endgame exactly")
+    parser.add_argument('--move-cache', type=int, default=None, metavar='SIZE',
+                        help="share an LRU cache of hard moves with this many entries between the seats")
+    parser.add_argument('--draw', action='store_true',
+                        help="draw from the boneyard instead of passing while it has pieces")
+    parser.add_argument('--spinner', action='store_true', help="the first double opens four arms")
+    parser.add_argument('--vectorized', action='store_true',
+                        help="play all rounds in lockstep NumPy arrays on one core instead of a process pool")
+    args = parser.parse_args(argv)
+    if args.vectorized and (args.draw or args.spinner):
+        parser.error("--draw and --spinner are not supported with --vectorized")
+    if args.mode == mexican_train.MEXICAN_TRAIN:
+        try:
+            mexican_train.check_settings(make_settings(len(args.seats), args.max_piece_value,
+                                                       args.pieces_per_player, args.draw, args.spinner))
+        except ValueError as e:
+            parser.error(str(e))
+
+    start = time.perf_counter()
+    if args.vectorized:
+        # NumPy is only needed for this mode
+        from vector_simulator import simulate_vectorized
+        try:
+            stats = simulate_vectorized(args.seats, args.mode, args.rounds, args.seed,
+                                        max_piece_value=args.max_piece_value,
+                                        pieces_per_player=args.pieces_per_player)
+        except ValueError as e:
+            # Sets, modes and seats the lockstep simulator does not play
+            parser.error(str(e))
+    else:
+        ai_options = {'time_budget': args.search_time, 'endgame_threshold': args.endgame_threshold,
+                      'move_cache_size': args.move_cache}
+        stats = simulate(args.seats, args.mode, args.rounds, args.seed, args.workers,
+                         args.max_piece_value, args.pieces_per_player, ai_options, args.draw, args.spinner)
+    elapsed = time.perf_counter() - start
+
+    print(f"Mode: {args.mode}   Seed: {args.seed}")
+    print(stats.report(args.seats))
+    print(f"\n{elapsed:.2f}s ({stats.rounds / elapsed:.0f} rounds/s)")
+
+
+if __name__ == "__main__":
+    main()
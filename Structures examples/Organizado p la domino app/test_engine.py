@@ -0,0 +1,266 @@
+# Run from the repository root: python -m pytest "Structures examples/Organizado p la domino app"
+# (from inside this folder unittest.py hides the standard library module pytest needs)
+import random
+
+import pytest
+
+from ai_player import AIPlayer
+from domino_board import CENTRE, DominoBoard, SpinnerBoard, fives_score, round_to_five
+from domino_engine import DominoEngine
+from domino_hand import VALUE_MASK, hand_mask, hand_score, hand_tiles, playable, value_tiles
+from domino_tiles import HIGH_PIPS, LOW_PIPS, tile_count, tile_id
+from endgame_solver import EndgameSolver
+from game_rules import get_rules, lowest_pips
+from game_settings import GameSettings
+from ismcts import Playout
+from knowledge import KnowledgeTracker
+from match_simulator import MatchStats
+from move_cache import MoveCache
+import mexican_train  # registers the Mexican Train rules
+
+
+def play_hashes(seed, rounds=3, difficulties=('hard', 'medium', 'easy', 'medium'), mode='Classic'):
+    engine = DominoEngine(mode=mode, seed=seed, ai_players=[AIPlayer(d) for d in difficulties])
+    hashes = []
+    for _ in range(rounds):
+        engine.play_round()
+        hashes.append(engine.state_hash())
+    return hashes
+
+
+@pytest.mark.parametrize('mode', ['Classic', 'Points', 'All-Fives'])
+def test_seeded_rounds_repeat(mode):
+    assert play_hashes(7, mode=mode) == play_hashes(7, mode=mode)
+
+
+def test_different_seeds_play_different_rounds():
+    assert play_hashes(7) != play_hashes(8)
+
+
+def test_seeded_expert_rounds_repeat():
+    # Expert only repeats with an iteration budget, time budgets never do
+    def hashes():
+        ais = [AIPlayer('expert', max_iterations=30) for _ in range(4)]
+        engine = DominoEngine(seed=3, ai_players=ais)
+        engine.play_round()
+        return engine.state_hash()
+    assert hashes() == hashes()
+
+
+def brute_force(state, root):
+    """+1 when root wins with best play from everybody, -1 otherwise, trying every line."""
+    values = []
+    for move in state.moves():
+        child = state.clone()
+        child.apply(move)
+        if child.winner is not None:
+            values.append(1 if child.winner == root else -1)
+        else:
+            values.append(brute_force(child, root))
+    return max(values) if state.current == root else min(values)
+
+
+def random_position(rng, players, per_hand):
+    tiles = rng.sample(range(tile_count(6)), players * per_hand)
+    hands = [sum(1 << t for t in tiles[p * per_hand:(p + 1) * per_hand]) for p in range(players)]
+    left, right = rng.randrange(7), rng.randrange(7)
+    return Playout(hands, left, right, rng.randrange(players), 0, [rng.randrange(3) for _ in range(players)])
+
+
+@pytest.mark.parametrize('players, per_hand', [(2, 2), (2, 3), (3, 2), (4, 2)])
+def test_endgame_solver_matches_brute_force(players, per_hand):
+    rng = random.Random(players * 10 + per_hand)
+    solver = EndgameSolver(table_bits=8)
+    for _ in range(60):
+        state = random_position(rng, players, per_hand)
+        root = state.current
+        value, move = solver.solve(state.hands, state.left, state.right, root, state.consecutive, state.passes)
+        assert value == brute_force(state, root)
+
+        # The move it picks has to reach that value
+        after = state.clone()
+        after.apply(move)
+        if after.winner is not None:
+            assert (1 if after.winner == root else -1) == value
+        else:
+            assert brute_force(after, root) == value
+
+
+PIP_SUMS = [0, 12, 7, 9]
+
+
+@pytest.mark.parametrize('mode, points', [
+    ('Classic', 1),
+    ('Block', 1),
+    ('Points', 28),
+    ('All-Fives', round_to_five(28)),
+    (mexican_train.MEXICAN_TRAIN, 28),
+])
+def test_payout_per_mode(mode, points):
+    assert get_rules(mode).payout(PIP_SUMS, sum(PIP_SUMS), 0) == points
+
+
+def test_payout_leaves_out_the_winners_own_pips():
+    assert get_rules('Points').payout(PIP_SUMS, sum(PIP_SUMS), 2) == 28
+    assert get_rules(mexican_train.MEXICAN_TRAIN).payout(PIP_SUMS, sum(PIP_SUMS), 2) == 21
+
+
+def test_only_all_fives_scores_plays():
+    assert get_rules('All-Fives').play_score(15) == 15
+    assert get_rules('All-Fives').play_score(12) == 0
+    for mode in ('Classic', 'Block', 'Points', mexican_train.MEXICAN_TRAIN):
+        assert get_rules(mode).play_score is None
+
+
+def test_blocked_round_tiebreak():
+    # Lowest pips, then fewest passes, then earliest seat
+    assert lowest_pips([9, 4, 4, 6], [0, 2, 1, 0]) == 2
+    assert lowest_pips([5, 5, 5], [1, 1, 1]) == 0
+
+
+@pytest.mark.parametrize('mode', ['Classic', 'Points', 'All-Fives'])
+def test_engine_pays_rounds_by_its_rule_set(mode):
+    engine = DominoEngine(mode=mode, seed=11)
+    rules = get_rules(mode)
+    for _ in range(5):
+        result = engine.play_round()
+        assert result.points == rules.payout(result.player_sums, sum(result.player_sums), result.winner)
+
+
+def test_mexican_train_rejects_settings_it_would_ignore():
+    for field in ('spinner', 'draw_from_boneyard'):
+        settings = GameSettings()
+        setattr(settings, field, True)
+        with pytest.raises(ValueError):
+            mexican_train.MexicanTrainEngine(settings)
+
+
+def test_playable_matches_a_scan_of_the_hand():
+    rng = random.Random(1)
+    for _ in range(200):
+        tiles = rng.sample(range(tile_count(6)), 7)
+        left, right = rng.randrange(7), rng.randrange(7)
+        expected = [t for t in sorted(tiles) if {left, right} & {LOW_PIPS[t], HIGH_PIPS[t]}]
+        assert hand_tiles(playable(hand_mask(tiles), left, right)) == expected
+
+
+def test_board_ends_follow_the_line():
+    board = DominoBoard(6)
+    assert board.place(tile_id(3, 5)) == 'end'
+    assert board.place(tile_id(3, 1)) == 'start'
+    assert board.place(tile_id(5, 6), 'end') == 'end'
+    assert board.place(tile_id(4, 4)) is None
+    assert (board.left_end, board.right_end) == (board[0].value1, board[-1].value2) == (1, 6)
+    assert board.open_mask == (1 << 1) | (1 << 6)
+
+
+def test_engine_board_ends_and_pip_sums_stay_in_step():
+    settings = GameSettings()
+    settings.draw_from_boneyard = True
+    settings.num_players = 2
+    engine = DominoEngine(settings, seed=5, ai_players=[AIPlayer('hard'), AIPlayer('medium')])
+    for _ in range(3):
+        engine.new_round()
+        while engine.game_active:
+            engine.step()
+            # Incremental sums against a full rescan of every hand
+            assert engine.pip_sums == [hand_score(hand) for hand in engine.players]
+            assert engine.remaining_pips == sum(engine.pip_sums)
+            board = engine.board
+            assert (board.left_end, board.right_end) == (board[0].value1, board[-1].value2)
+
+
+def test_knowledge_tracks_voids_and_unseen_tiles():
+    knowledge = KnowledgeTracker(4, 6)
+    knowledge.on_pass(1, (1 << 3) | (1 << 5))
+    assert knowledge.is_void(1, 3) and knowledge.is_void(1, 5) and not knowledge.is_void(1, 4)
+    assert knowledge.void_tiles[1] == VALUE_MASK[3] | VALUE_MASK[5]
+
+    # A draw only keeps the ends drawn against
+    knowledge.on_draw(1, 1 << 2)
+    assert knowledge.void_values[1] == 1 << 2 and knowledge.void_tiles[1] == value_tiles(1 << 2)
+
+    knowledge.on_play(0, tile_id(2, 4))
+    hand = hand_mask([tile_id(0, 0), tile_id(1, 2)])
+    assert knowledge.unplayed[2] == 6 and knowledge.unplayed[4] == 6
+    assert knowledge.hidden_from(hand).bit_count() == tile_count(6) - 3
+    assert knowledge.hidden_with_value(2, hand) == 5
+
+
+def test_move_cache_counts_hits_and_evicts_the_oldest():
+    cache = MoveCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert (cache.hits, cache.misses, len(cache)) == (3, 1, 2)
+
+
+def test_draw_until_playable_stops_at_the_first_fit():
+    settings = GameSettings()
+    settings.draw_from_boneyard = True
+    engine = DominoEngine(settings, seed=2)
+    engine.new_round()
+    engine.board.clear()
+    engine.board.place(tile_id(6, 6))
+    player = engine.current_player
+    engine.players[player] = hand_mask([tile_id(0, 1)])
+    engine.pip_sums[player] = 1
+    # Drawn from the back: two misses, then a 6
+    engine.remaining_pieces = [tile_id(2, 2), tile_id(3, 6), tile_id(0, 2), tile_id(1, 4)]
+
+    assert engine.draw_until_playable() == 3
+    assert engine.remaining_pieces == [tile_id(2, 2)]
+    assert engine.legal_moves() == 1 << tile_id(3, 6)
+    assert engine.pip_sums[player] == hand_score(engine.players[player])
+
+
+def test_all_fives_end_sum():
+    board = DominoBoard(6)
+    board.place(tile_id(5, 5))
+    assert board.end_sum == 10
+    assert board.sum_after(tile_id(5, 0), 'end') == 10
+    board.place(tile_id(5, 0), 'end')
+    # The double still counts both halves at its end
+    assert board.end_sum == 10 and fives_score(board.end_sum) == 10
+    board.place(tile_id(0, 3))
+    assert board.end_sum == 13 and fives_score(board.end_sum) == 0
+
+
+def test_spinner_opens_its_sides_once_played_on_both_ends():
+    board = SpinnerBoard(6)
+    assert board.place(tile_id(6, 6)) == CENTRE
+    assert board.arms_at[6] == [0, 1] and board.open_mask == 1 << 6
+    assert board.place(tile_id(6, 2)) == 0
+    assert board.arms_at[2] == [0] and board.arms_at[6] == [1]
+    assert board.place(tile_id(6, 4)) == 1
+    assert board.arms_at[6] == [2, 3]
+    assert board.open_mask == (1 << 2) | (1 << 4) | (1 << 6)
+    assert board.playable(hand_mask([tile_id(1, 6), tile_id(1, 3)])) == 1 << tile_id(1, 6)
+
+
+def test_wilson_interval():
+    stats = MatchStats(2)
+    for winner in [0] * 50 + [1] * 50:
+        stats.add(winner, 3)
+    low, high = stats.win_interval(0)
+    assert low == pytest.approx(0.4038, abs=1e-4) and high == pytest.approx(0.5962, abs=1e-4)
+    assert stats.mean_rounds() == 3 and stats.rounds_variance() == 0
+
+
+def test_match_pays_every_round_until_the_target():
+    engine = DominoEngine(mode='Points', target_score=100, seed=9)
+    results = []
+    play_round = engine.play_round
+    engine.play_round = lambda: results.append(play_round()) or results[-1]
+
+    winner = engine.play_match()
+    assert engine.scores[winner] == max(engine.scores) >= 100
+    # The scores are the round payouts and nothing else, and only the last round reached the target
+    rules = get_rules('Points')
+    for result in results:
+        assert result.points == rules.payout(result.player_sums, sum(result.player_sums), result.winner)
+    assert engine.scores == [sum(r.points for r in results if r.winner == seat) for seat in range(4)]
+    assert max(sum(r.points for r in results[:-1] if r.winner == seat) for seat in range(4)) < 100
@@ -0,0 +1,268 @@
+"""Lockstep self-play: thousands of rounds advanced together in NumPy arrays.
+
+Every lane is one table. Each step lets the current player of every lane
+take its turn at once, using the same easy/medium/hard strategies as
+AIPlayer.choose_tile written as array operations. A lane that finishes a
+round is dealt again straight away, with the last winner starting, just
+like consecutive DominoEngine.play_round() calls. The result is a
+SimulationStats, so it reports exactly like simulator.py.
+
+Hands are uint64 bitmasks of tile ids, as in domino_hand, so a turn is a
+few operations on one word per lane instead of one per tile. That limits
+the sets to 64 tiles (up to double-9); bigger sets need simulator.simulate.
+"""
+import numpy as np
+
+from domino_tiles import HIGH_PIPS, IS_DOUBLE, LOW_PIPS, TILE_SCORE, tile_count
+from domino_hand import VALUE_MASK, set_mask
+from ai_player import BLOCK_NEXT_BONUS
+from game_rules import all_pips, get_rules, lowest_pips, one_point, opponents_pips
+from game_settings import GameSettings
+from simulator import SimulationStats, make_settings
+
+POLICIES = {'easy': 0, 'medium': 1, 'hard': 2}
+MAX_TILES = 64
+
+# RuleSet payouts as array operations: (sums, winner) -> points of every finished lane
+VECTOR_PAYOUTS = {
+    one_point: lambda sums, winner: np.ones(len(sums), dtype=np.int64),
+    all_pips: lambda sums, winner: sums.sum(axis=1),
+    opponents_pips: lambda sums, winner: sums.sum(axis=1) - sums[np.arange(len(sums)), winner],
+}
+
+ONE = np.uint64(1)
+_M1, _M2, _M4, _H01 = (np.uint64(m) for m in (0x5555555555555555, 0x3333333333333333,
+                                              0x0F0F0F0F0F0F0F0F, 0x0101010101010101))
+
+
+def popcount(masks):
+    """Set bits of every uint64 in masks."""
+    x = masks - ((masks >> ONE) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return ((x * _H01) >> np.uint64(56)).astype(np.int64)
+
+
+def lowest_tile(masks):
+    """Lowest tile id in every non-empty mask (the lowest bit is a power of two, exact as a float)."""
+    return np.log2((masks & (~masks + ONE)).astype(np.float64)).astype(np.int64)
+
+
+class VectorSimulator:
+    def __init__(self, seats, mode='Classic', settings=None, lanes=16384, seed=0):
+        self.settings = settings or GameSettings()
+        self.settings.validate()
+        if self.settings.draw_from_boneyard or self.settings.spinner:
+            raise ValueError("Lockstep simulation only plays two-ended games without draws")
+        if len(seats) != self.settings.num_players:
+            raise ValueError("Need exactly one difficulty per seat")
+        if any(d not in POLICIES for d in seats):
+            raise ValueError(f"Lockstep simulation supports {', '.join(POLICIES)} seats only")
+        rules = get_rules(mode)
+        if (rules.engine_class is not None or rules.play_score is not None
+                or rules.tiebreak is not lowest_pips or rules.payout not in VECTOR_PAYOUTS):
+            raise ValueError(f"Lockstep simulation does not play {mode}")
+        self.seat_policy = np.array([POLICIES[d] for d in seats])
+        self.mode = mode
+        self.payout = VECTOR_PAYOUTS[rules.payout]
+        self.lanes = lanes
+        self.rng = np.random.default_rng(seed)
+
+        self.num_players = self.settings.num_players
+        self.per_player = self.settings.pieces_per_player
+        self.num_values = self.settings.max_piece_value + 1
+        self.num_tiles = tile_count(self.settings.max_piece_value)
+        if self.num_tiles > MAX_TILES:
+            raise ValueError("Lockstep simulation only plays sets up to double-9")
+        if self.num_players * self.per_player > self.num_tiles:
+            raise ValueError("Not enough tiles in the set to deal every hand")
+
+        t = self.num_tiles
+        self.low = np.array(LOW_PIPS[:t])
+        self.high = np.array(HIGH_PIPS[:t])
+        self.score = np.array(TILE_SCORE[:t])
+        self.is_double = np.array(IS_DOUBLE[:t])
+        self.bit = ONE << np.arange(t, dtype=np.uint64)
+
+        # fits[v] has a bit for every tile carrying v; the extra last entry stands for the empty board
+        self.empty_end = self.num_values
+        full = set_mask(self.settings.max_piece_value)
+        self.fits = np.array([mask & full for mask in VALUE_MASK[:self.num_values]] + [full], dtype=np.uint64)
+
+        # share[t] holds the tiles with a value in common with t, for the hard move score
+        self.share = self.fits[self.low] | self.fits[self.high]
+        self.opening_key = np.where(self.is_double, 1000 + self.low, self.score)
+        self.hard_base = self.score + 5 * self.is_double
+
+    def _tiles(self, masks):
+        """masks spread out into one bool per tile, for the few steps that work on whole hands."""
+        return (masks[..., None] & self.bit).astype(bool)
+
+    def _deal(self, lanes):
+        n = len(lanes)
+        order = np.argsort(self.rng.random((n, self.num_tiles)), axis=1)
+        dealt = order[:, :self.num_players * self.per_player].reshape(n, self.num_players, self.per_player)
+
+        self.hands[lanes] = np.bitwise_or.reduce(self.bit[dealt], axis=2)
+        self.voids[lanes] = 0
+        self.left[lanes] = self.empty_end
+        self.right[lanes] = self.empty_end
+        self.consecutive[lanes] = 0
+        self.passes[lanes] = 0
+        self.dealt_at[lanes] = self.step
+
+    def _highest_double_holder(self, lanes):
+        doubles = np.where(self._tiles(self.hands[lanes]) & self.is_double, self.low, -1)
+        # Nobody holding a double leaves seat 0 to start, as in _find_starting_player
+        return doubles.max(axis=2).argmax(axis=1)
+
+    def _choose(self, hand, moves, policy, opening, left, right, next_voids):
+        """Tile to play for lanes that have at least one move."""
+        # Easy and medium pick uniformly among valid tiles: skip k of them, k drawn below the count
+        skip = (self.rng.random(len(hand)) * popcount(moves)).astype(np.int64)
+        rest = moves
+        for _ in range(skip.max(initial=0)):
+            rest = np.where(skip > 0, rest & (rest - ONE), rest)
+            skip -= 1
+        choice = lowest_tile(rest)
+
+        # Hard's scores need both ends, an opening lane leads with opening_key below
+        hard = np.flatnonzero((policy == 2) & ~opening)
+        if len(hard):
+            choice[hard] = self._choose_hard(hand[hard], moves[hard], left[hard], right[hard], next_voids[hard])
+
+        lead = np.flatnonzero(opening & (policy != 0))
+        if len(lead):
+            choice[lead] = np.where(self._tiles(hand[lead]), self.opening_key, -1).argmax(axis=1)
+        return choice
+
+    def _choose_hard(self, hand, moves, left, right, next_voids):
+        # One candidate tile of every lane per pass, lowest first, so ties go to the lowest id like argmax
+        best = np.zeros(len(hand), dtype=np.int64)
+        best_score = np.full(len(hand), -1)
+        rest = moves
+        while rest.any():
+            has = rest != 0
+            t = lowest_tile(np.where(has, rest, ONE))
+            score = self.hard_base[t] + 2 * popcount(hand & self.share[t])
+
+            # BLOCK_NEXT_BONUS when the next player is known to hold neither end afterwards
+            at_start = (self.fits[left] >> t.astype(np.uint64)) & ONE != 0
+            new_left = np.where(at_start, self.score[t] - left, left)
+            new_right = np.where(at_start, right, self.score[t] - right)
+            score = score + BLOCK_NEXT_BONUS * (next_voids >> new_left & next_voids >> new_right & 1)
+
+            better = has & (score > best_score)
+            best = np.where(better, t, best)
+            best_score = np.where(better, score, best_score)
+            rest = rest & (rest - ONE)
+        return best
+
+    def run(self, rounds):
+        g = self.lanes
+        p = self.num_players
+        self.hands = np.zeros((g, p), dtype=np.uint64)
+        # voids[lane, seat] has bit v once the seat passed with v showing, like KnowledgeTracker
+        self.voids = np.zeros((g, p), dtype=np.int64)
+        self.left = np.zeros(g, dtype=np.int64)
+        self.right = np.zeros(g, dtype=np.int64)
+        self.consecutive = np.zeros(g, dtype=np.int32)
+        self.passes = np.zeros((g, p), dtype=np.int64)
+        # Every step is one turn in every active lane, so a round's turns are steps since its deal
+        self.step = 0
+        self.dealt_at = np.zeros(g, dtype=np.int64)
+        # Flat views, lane * p + seat picks one seat of every lane with a 1-D index
+        hands, voids, passes = self.hands.reshape(-1), self.voids.reshape(-1), self.passes.reshape(-1)
+
+        # Spread the rounds over the lanes, lanes with nothing to play stay idle
+        quota = np.full(g, rounds // g)
+        quota[:rounds % g] += 1
+        active = quota > 0
+        done = np.zeros(g, dtype=np.int64)
+
+        all_lanes = np.arange(g)
+        self._deal(all_lanes)
+        current = self._highest_double_holder(all_lanes)
+
+        stats = SimulationStats(p)
+        wins = np.zeros(p, dtype=np.int64)
+        points = np.zeros(p, dtype=np.int64)
+
+        while active.any():
+            self.step += 1
+            lanes = np.flatnonzero(active)
+            cur = current[lanes]
+            at = lanes * p + cur
+            hand = hands[at]
+            left = self.left[lanes]
+            right = self.right[lanes]
+
+            moves = hand & (self.fits[left] | self.fits[right])
+            can_move = moves != 0
+
+            # Lanes that play: start end is tried first, the same as DominoBoard.place
+            play = lanes[can_move]
+            seat = cur[can_move]
+            pl, pr = left[can_move], right[can_move]
+            first = pl == self.empty_end
+            t = self._choose(hand[can_move], moves[can_move], self.seat_policy[seat], first, pl, pr,
+                             voids[play * p + (seat + 1) % p])
+            at_start = ~first & ((self.low[t] == pl) | (self.high[t] == pl))
+            at_end = ~first & ~at_start
+            self.left[play] = np.where(first, self.low[t], np.where(at_start, self.score[t] - pl, pl))
+            self.right[play] = np.where(first, self.high[t], np.where(at_end, self.score[t] - pr, pr))
+            left_hand = hand[can_move] & ~self.bit[t]
+            hands[at[can_move]] = left_hand
+            self.consecutive[play] = 0
+            out = left_hand == 0
+            went_out = play[out]
+            out_seat = seat[out]
+
+            # Lanes that pass
+            stuck = lanes[~can_move]
+            at = at[~can_move]
+            self.consecutive[stuck] += 1
+            passes[at] += 1
+            voids[at] |= (1 << left[~can_move]) | (1 << right[~can_move])
+            blocked = stuck[self.consecutive[stuck] >= p]
+
+            finished = np.concatenate([went_out, blocked])
+            current[lanes] = (cur + 1) % p
+            if not len(finished):
+                continue
+
+            sums = (self._tiles(self.hands[finished]) * self.score).sum(axis=2)
+            winner = np.empty(len(finished), dtype=np.int64)
+            winner[:len(went_out)] = out_seat
+            # Lowest sum, then fewest passes, then earliest seat
+            tiebreak = (sums[len(went_out):] * (1 << 20) + self.passes[blocked]) * p + np.arange(p)
+            winner[len(went_out):] = tiebreak.argmin(axis=1)
+
+            round_points = self.payout(sums, winner)
+            np.add.at(wins, winner, 1)
+            np.add.at(points, winner, round_points)
+            stats.rounds += len(finished)
+            stats.turns += int((self.step - self.dealt_at[finished]).sum())
+            stats.blocked += len(blocked)
+            for seat in range(p):
+                stats.passes[seat] += int(self.passes[finished, seat].sum())
+
+            # Deal again where rounds are left, the last winner leads
+            done[finished] += 1
+            again = done[finished] < quota[finished]
+            active[finished[~again]] = False
+            redeal = finished[again]
+            if len(redeal):
+                self._deal(redeal)
+                current[redeal] = winner[again]
+
+        stats.wins = [int(w) for w in wins]
+        stats.points = [int(x) for x in points]
+        return stats
+
+
+def simulate_vectorized(seats, mode='Classic', rounds=10000, seed=0, lanes=16384,
+                        max_piece_value=None, pieces_per_player=None):
+    settings = make_settings(len(seats), max_piece_value, pieces_per_player)
+    simulator = VectorSimulator(seats, mode, settings, lanes=min(lanes, max(rounds, 1)), seed=seed)
+    return simulator.run(rounds)
@@ -5,24 +5,46 @@ from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
+from kivy.uix.floatlayout import FloatLayout
+from kivy.uix.stencilview import StencilView
 from kivy.uix.scrollview import ScrollView
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recyclegridlayout import RecycleGridLayout
 from kivy.core.window import Window
 from kivy.uix.popup import Popup
 from kivy.clock import Clock  # Add this import
 from kivy.graphics import Rectangle, Color, Ellipse, PushMatrix, PopMatrix, Line, Scale, Rotate
+from kivy.graphics import Fbo, ClearColor, ClearBuffers
 from kivy.properties import NumericProperty
 from kivy.animation import Animation
+from kivy.logger import Logger
+import os
+import sys
+from snake_layout import SNAKE_LONG, SNAKE_SHORT, SnakeLayout
+from collections import OrderedDict, deque
 import random
 
+# Scoring comes from the headless engine's rule sets, one set of rules for both
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Organizado p la domino app'))
+from domino_hand import VALUE_MASK, iter_tiles
+from domino_tiles import tile_id
+from game_rules import get_rules
+from game_settings import GameSettings
+import mexican_train  # registers the Mexican Train rules
+
+# Biggest set the game can deal, double-18 has 190 pieces
+MAX_PIP_VALUE = 18
+
 class Domino:
     def __init__(self, value1, value2):
         try:
             self.value1 = int(value1)
             self.value2 = int(value2)
-            if not (0 <= self.value1 <= 6 and 0 <= self.value2 <= 6):
-                raise ValueError("Domino values must be between 0 and 6")
+            if not (0 <= self.value1 <= MAX_PIP_VALUE and 0 <= self.value2 <= MAX_PIP_VALUE):
+                raise ValueError(f"Domino values must be between 0 and {MAX_PIP_VALUE}")
         except ValueError:
-            raise ValueError("Domino values must be valid integers between 0 and 6")
+            raise ValueError(f"Domino values must be valid integers between 0 and {MAX_PIP_VALUE}")
 
     def __repr__(self):
         return f"[{self.value1}|{self.value2}]"
@@ -33,6 +55,70 @@ class Domino:
     def get_score(self):
         return self.value1 + self.value2
 
+    @property
+    def tile(self):
+        # The engine's tile id, the same whichever way round the piece lies
+        return tile_id(self.value1, self.value2)
+
+
+class Hand(list):
+    """A player's pieces with a running pip total and tile bitmask (see domino_hand),
+    kept up to date on every pop and append.
+
+    listener, when set, is called as listener(index, piece, added) after
+    every change, so a view can follow the hand one piece at a time.
+    """
+
+    def __init__(self, pieces=()):
+        super().__init__(pieces)
+        self.pips = sum(piece.get_score() for piece in self)
+        # Tile id -> piece, with mask it finds the pieces that fit without walking the hand
+        self.pieces = {piece.tile: piece for piece in self}
+        self.mask = 0
+        for tile in self.pieces:
+            self.mask |= 1 << tile
+        self.listener = None
+
+    def pop(self, index=-1):
+        if index < 0:
+            index += len(self)
+        piece = super().pop(index)
+        self.pips -= piece.get_score()
+        self.mask &= ~(1 << piece.tile)
+        del self.pieces[piece.tile]
+        if self.listener is not None:
+            self.listener(index, piece, False)
+        return piece
+
+    def append(self, piece):
+        self.insert(len(self), piece)
+
+    def insert(self, index, piece):
+        index = min(index, len(self))
+        super().insert(index, piece)
+        self.pips += piece.get_score()
+        self.mask |= 1 << piece.tile
+        self.pieces[piece.tile] = piece
+        if self.listener is not None:
+            self.listener(index, piece, True)
+
+    def remove(self, piece):
+        self.pop(self.index(piece))
+
+
+# What decided a blocked game, see deadlock_reason
+BY_SUM, BY_PASSES, BY_SEAT = 0, 1, 2
+
+
+def deadlock_reason(player_sums, passes, winner):
+    """Why game_rules.lowest_pips picked winner: BY_SUM, BY_PASSES or BY_SEAT, for the blocked game popup."""
+    tied = [i for i, pips in enumerate(player_sums) if pips == player_sums[winner]]
+    if len(tied) == 1:
+        return BY_SUM
+    if sum(1 for i in tied if passes[i] == passes[winner]) == 1:
+        return BY_PASSES
+    return BY_SEAT
+
 
 class AIPlayer:
     def __init__(self, difficulty="medium"):
@@ -47,6 +133,13 @@ class AIPlayer:
             return self._choose_basic_move(hand, board)
 
 
+    def choose_train_move(self, hand, moves):
+        """Pick one of the (piece index, train) moves of a Mexican Train turn."""
+        if self.difficulty == "hard":
+            # Get rid of the heaviest piece, moves list the best train for it first
+            return max(moves, key=lambda move: hand[move[0]].get_score())
+        return random.choice(moves)
+
     def _choose_random_move(self, hand, board):
         if not board:
             return random.randint(0, len(hand) - 1)
@@ -139,6 +232,84 @@ class AIPlayer:
         return any(value in (start_value, end_value) for value in (piece.value1, piece.value2))
 
 
+# Relative dot positions per value (from -0.5 to 0.5), bigger values are added by dot_layout
+DOT_LAYOUTS = {
+    0: [],
+    1: [(0, 0)],
+    2: [(-0.3, 0.3), (0.3, -0.3)],
+    3: [(-0.3, 0.3), (0, 0), (0.3, -0.3)],
+    4: [(-0.3, 0.3), (-0.3, -0.3), (0.3, 0.3), (0.3, -0.3)],
+    5: [(-0.3, 0.3), (-0.3, -0.3), (0, 0), (0.3, 0.3), (0.3, -0.3)],
+    # Two columns of three dots each
+    6: [(-0.3, 0.3), (0, 0.3), (0.3, 0.3),  # Left column
+        (-0.3, -0.3), (0, -0.3), (0.3, -0.3)],  # Right column
+}
+
+
+def dot_layout(value):
+    if value not in DOT_LAYOUTS:
+        # Bigger sets: rows of three dots
+        rows = (value + 2) // 3
+        DOT_LAYOUTS[value] = [(-0.35 + 0.35 * (i % 3), 0.35 - 0.7 * (i // 3) / max(rows - 1, 1))
+                              for i in range(value)]
+    return DOT_LAYOUTS[value]
+
+
+# Faces are drawn once at this size, the Rectangle showing one scales it to the piece
+FACE_TEXTURE_SIZE = (160, 80)
+# (value1, value2, dots color) -> (Fbo, texture), least recently used dropped past the limit
+TEXTURE_CACHE_SIZE = 512
+_tile_textures = OrderedDict()
+
+
+def tile_texture(value1, value2, dots_color):
+    """Texture of a [value1|value2] face, drawn once into an Fbo and shared by every piece at any size."""
+    key = (value1, value2, tuple(dots_color))
+    cached = _tile_textures.get(key)
+    if cached is not None:
+        _tile_textures.move_to_end(key)
+        return cached[1]
+
+    width, height = FACE_TEXTURE_SIZE
+    fbo = Fbo(size=(width, height))
+    with fbo:
+        ClearColor(0, 0, 0, 0)
+        ClearBuffers()
+        # White face
+        Color(0.95, 0.95, 0.95, 1)
+        Rectangle(pos=(0, 0), size=(width, height))
+        # Black border and dividing line, twice the 2px they have on an 80x40 piece
+        Color(0, 0, 0, 1)
+        Line(rectangle=(2, 2, width - 4, height - 4), width=4.0)
+        Line(points=[width / 2, 0, width / 2, height], width=4.0)
+        Color(*dots_color)
+        _draw_dots(value1, 0, width, height)
+        _draw_dots(value2, width / 2, width, height)
+    fbo.draw()
+
+    if len(_tile_textures) >= TEXTURE_CACHE_SIZE:
+        _tile_textures.popitem(last=False)
+    # The Fbo stays referenced so it can redraw the texture after a GL context loss
+    _tile_textures[key] = (fbo, fbo.texture)
+    return fbo.texture
+
+
+def _draw_dots(value, left, width, height):
+    # Dots of one half, left is where that half starts
+    half_width = width / 2
+    dot_size = min(width, height) / 6
+    base_x = left + half_width / 2
+    base_y = height / 2
+    spacing = min(half_width, height) * 0.8
+    if value > 6:
+        # Smaller so they still fit
+        dot_size = dot_size * 3 / max((value + 2) // 3, 3)
+    for dx, dy in dot_layout(value):
+        x = base_x + dx * spacing - dot_size / 2
+        y = base_y + dy * spacing - dot_size / 2
+        Ellipse(pos=(x, y), size=(dot_size, dot_size))
+
+
 class DominoPiece(Button):
     rotation = NumericProperty(0)
     
@@ -157,6 +328,12 @@ class DominoPiece(Button):
         self.background_color = (0.95, 0.95, 0.95, 0.1)  # Slightly off-white
         self.dots_color = (0, 0, 0, 1)  # Pure black for better contrast
         self.text = ''
+        # on_press callback bound by PiecePool.acquire, dropped again on release
+        self.pool_callback = None
+        self.pooled = False
+        # Canvas instructions, made on the first update_canvas and only changed after that
+        self._rotate = None
+        self._face = None
         
 
         self.bind(pos=self.update_canvas)
@@ -169,6 +346,15 @@ class DominoPiece(Button):
 
             self.update_canvas()
 
+    def rebind(self, domino, size=(80, 40)):
+        """Show another domino at another size, left as a freshly built piece would be."""
+        self.domino = domino
+        self.is_vertical = domino.value1 == domino.value2
+        self.size = size
+        self.rotation = 90 if self.is_vertical else 0
+        self.background_color = (0.95, 0.95, 0.95, 0.1)
+        self.update_canvas()
+
     def rotate(self):
         self.is_vertical = not self.is_vertical
         
@@ -178,83 +364,207 @@ class DominoPiece(Button):
 
         return self.size
 
+    def face_rect(self):
+        # Where the face is drawn before rotation
+        return self.pos, self.size
+
     def update_canvas(self, *args):
-        self.canvas.before.clear()
-        self.canvas.after.clear()
-        
-        with self.canvas.before:
+        # The face comes from the texture cache, a move or a turn only updates two instructions
+        pos, size = self.face_rect()
+        texture = tile_texture(self.domino.value1, self.domino.value2, self.dots_color)
+        if self._face is None:
+            with self.canvas.before:
+                PushMatrix()
+                self._rotate = Rotate(angle=self.rotation, origin=self.center)
+                Color(1, 1, 1, 1)
+                self._face = Rectangle(pos=pos, size=size, texture=texture)
+            with self.canvas.after:
+                PopMatrix()
+            return
 
+        self._rotate.angle = self.rotation
+        self._rotate.origin = self.center
+        self._face.pos = pos
+        self._face.size = size
+        self._face.texture = texture
 
-            PushMatrix()
-            Rotate(angle=self.rotation, origin=self.center)
-            
-            # Draw white background
-            Color(0.95, 0.95, 0.95, 1)
-            Rectangle(pos=self.pos, size=self.size)
-            
-            # Draw black border
-            Color(0, 0, 0, 1)
-            Line(rectangle=(self.x, self.y, self.width, self.height), width=2.0)
-            
-            # Draw dividing line
-            Line(points=[self.center_x, self.y, self.center_x, self.y + self.height], width=2.0)
-            
-            # Draw dots
-            self._draw_dots(self.domino.value1, 'left')
-            self._draw_dots(self.domino.value2, 'right')
-            
-        with self.canvas.after:
-            PopMatrix()
+    def flip_piece(self):
+        anim = Animation(rotation=360, duration=0.5)
+        anim.start(self)
+        Clock.schedule_once(lambda dt: self._on_flip_complete(), 0.25)
 
-   
+    def _on_flip_complete(self):
+        self.domino.flip()
+        self.update_canvas()
 
-    def _draw_dots(self, value, side):
-        dot_size = min(self.width, self.height) / 6  # Increased dot size
-        
-        # Calculate the center of each half
-        half_width = self.width / 2
-        if side == 'left':
-            base_x = self.x + half_width / 2
+
+class PiecePool:
+    """DominoPiece widgets kept for reuse instead of being built for every turn and round.
+
+    acquire() rebinds a free piece to the domino (a hit) or builds a new
+    one (a miss). release() takes the piece off its parent, stops its
+    animations and drops the on_press callback it was acquired with.
+    live counts the pieces handed out and not released, after a round it
+    should match what is on screen, anything more is a leak.
+    """
+
+    def __init__(self, max_free=256):
+        self.free = []
+        self.max_free = max_free
+        self.hits = 0
+        self.misses = 0
+        self.live = 0
+
+    def acquire(self, domino, size=(80, 40), on_press=None):
+        if self.free:
+            piece = self.free.pop()
+            piece.rebind(domino, size)
+            self.hits += 1
         else:
-            base_x = self.x + half_width + half_width / 2
-            
-        base_y = self.y + self.height / 2
-        
-        # Define relative positions for dots (values from -0.5 to 0.5)
-        dot_layouts = {
-            1: [(0, 0)],
-            2: [(-0.3, 0.3), (0.3, -0.3)],
-            3: [(-0.3, 0.3), (0, 0), (0.3, -0.3)],
-            4: [(-0.3, 0.3), (-0.3, -0.3), (0.3, 0.3), (0.3, -0.3)],
-            5: [(-0.3, 0.3), (-0.3, -0.3), (0, 0), (0.3, 0.3), (0.3, -0.3)],
-            # Two columns of three dots each
-            6: [(-0.3, 0.3), (0, 0.3), (0.3, 0.3),  # Left column
-            (-0.3, -0.3), (0, -0.3), (0.3, -0.3)]     # Right column
-            
-    
-        }
+            piece = DominoPiece(domino, size=size)
+            self.misses += 1
+        piece.pooled = False
+        if on_press is not None:
+            piece.bind(on_press=on_press)
+            piece.pool_callback = on_press
+        self.live += 1
+        return piece
+
+    def release(self, piece):
+        if piece.pooled:
+            return
+        if piece.parent is not None:
+            piece.parent.remove_widget(piece)
+        Animation.cancel_all(piece)
+        if piece.pool_callback is not None:
+            piece.unbind(on_press=piece.pool_callback)
+            piece.pool_callback = None
+        piece.pooled = True
+        self.live -= 1
+        if len(self.free) < self.max_free:
+            self.free.append(piece)
 
-        # Draw the dots
-        Color(*self.dots_color)
-        spacing = min(half_width, self.height) * 0.8  # Reduced spacing
-        
-        if value in dot_layouts:
-            for dx, dy in dot_layouts[value]:
-                x = base_x + dx * spacing - dot_size / 2
-                y = base_y + dy * spacing - dot_size / 2
-                Ellipse(pos=(x, y), size=(dot_size, dot_size))
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
 
+    def report(self):
+        return (f"{self.live} live, {len(self.free)} free, {self.hits} hits, {self.misses} misses "
+                f"({self.hit_rate():.0%} hit rate)")
 
 
-    def flip_piece(self):
-        anim = Animation(rotation=360, duration=0.5)
-        anim.start(self)
-        Clock.schedule_once(lambda dt: self._on_flip_complete(), 0.25)
+# Board pieces, the hand recycles its own through HandView
+piece_pool = PiecePool()
 
-    def _on_flip_complete(self):
-        self.domino.flip()
+
+# Hand pieces stand upright, their face is drawn lying down and turned
+HAND_PIECE_SIZE = (40, 80)
+HAND_COLOR = (0.95, 0.95, 0.95, 0.1)
+WAITING_COLOR = (0.7, 0.7, 0.7, 1)
+SELECTED_COLOR = (0.2, 0.7, 0.2, 0.5)
+
+
+class HandPiece(RecycleDataViewBehavior, DominoPiece):
+    """A view of one row of HandView.data, shown for whichever row scrolls into it."""
+
+    def __init__(self, **kwargs):
+        super().__init__(Domino(0, 0), size=HAND_PIECE_SIZE, **kwargs)
+        self.rotation = 90
+        self.index = None
+        self.hand_view = None
+        self.bind(on_press=self._on_tap)
+
+    def face_rect(self):
+        width, height = self.size
+        return (self.center_x - height / 2, self.center_y - width / 2), (height, width)
+
+    def refresh_view_attrs(self, rv, index, data):
+        # Everything shown comes from the row, nothing is left over from the last row this view had
+        self.hand_view = rv
+        self.index = index
+        self.domino = data['domino']
+        self.selected = data['selected']
+        self.show_color()
         self.update_canvas()
 
+    def show_color(self):
+        if self.selected:
+            self.background_color = SELECTED_COLOR
+        else:
+            self.background_color = HAND_COLOR if self.hand_view.my_turn else WAITING_COLOR
+
+    def _on_tap(self, *args):
+        if self.hand_view is not None and self.index is not None:
+            self.hand_view.select_callback(self.index)
+
+
+class HandView(RecycleView):
+    """The human hand as data rows {'domino', 'selected'}.
+
+    Only the rows that fit in the view get a HandPiece; scrolling hands
+    them to other rows, so a 50 piece hand costs no more widgets than a
+    7 piece one. The view listens to its Hand, a play or a draw pops or
+    inserts the one row it changed, and a selection rewrites two rows.
+    """
+
+    def __init__(self, select_callback, cols=8, **kwargs):
+        super().__init__(**kwargs)
+        self.select_callback = select_callback
+        self.viewclass = HandPiece
+        self.hand = None
+        self.selected = None
+        self.my_turn = False
+        self.layout = layout = RecycleGridLayout(
+            cols=cols,
+            spacing=10,
+            padding=10,
+            default_size=HAND_PIECE_SIZE,
+            default_size_hint=(None, None),
+            size_hint=(None, None),
+        )
+        layout.bind(minimum_size=layout.setter('size'))
+        self.add_widget(layout)
+
+    def show_hand(self, hand):
+        """Follow hand from now on, only a new hand (a new round) fills every row."""
+        if hand is self.hand:
+            return
+        if self.hand is not None:
+            self.hand.listener = None
+        self.hand = hand
+        self.selected = None
+        hand.listener = self._on_hand_change
+        self.data = [{'domino': piece, 'selected': False} for piece in hand]
+
+    def _on_hand_change(self, index, piece, added):
+        if added:
+            self.data.insert(index, {'domino': piece, 'selected': False})
+            if self.selected is not None and index <= self.selected:
+                self.selected += 1
+            return
+        self.data.pop(index)
+        if self.selected == index:
+            self.selected = None
+        elif self.selected is not None and index < self.selected:
+            self.selected -= 1
+
+    def select(self, index):
+        if index is not None and not 0 <= index < len(self.data):
+            index = None
+        if index == self.selected:
+            return
+        for row, flag in ((self.selected, False), (index, True)):
+            if row is not None:
+                self.data[row] = {'domino': self.data[row]['domino'], 'selected': flag}
+        self.selected = index
+
+    def set_turn(self, my_turn):
+        # Only the pieces on screen have a view to repaint
+        if my_turn != self.my_turn:
+            self.my_turn = my_turn
+            for view in self.layout.children:
+                view.show_color()
+
 
 # class GameBoard:
 #     def __init__(self, gap=10):
@@ -295,95 +605,164 @@ class DominoPiece(Button):
 
 
 
-class BoardLayout(BoxLayout):
+# Mouse wheel zoom per step, and how far the board zooms either way
+ZOOM_STEP = 1.1
+MIN_ZOOM = 0.3
+MAX_ZOOM = 2.0
+
+
+class BoardLayout(StencilView, FloatLayout):
+    """The line of play laid out by a SnakeLayout, or a Mexican Train table.
+
+    Only the pieces inside the board get a DominoPiece; dragging pans
+    the view, the mouse wheel zooms it, and cull() swaps pieces in and
+    out of piece_pool as they come into view.
+    """
+
     def __init__(self, gap=5, **kwargs):
         super().__init__(**kwargs)
-        self.orientation = 'horizontal'
-        self.spacing = 0
-        self.padding = 0
         self.size_hint_y = None
         self.width = 600
         self.height = 450
         self.gap = gap
-        self.pieces = []
-        
-        self.left_spacer = Widget(size_hint_x=0.3)
-        self.add_widget(self.left_spacer)
-
-        # Create a center anchor widget
+        # The board's dominoes in line order, sync() compares them with the board
+        self.line = deque()
+        self.snake = None
+        # placement index -> DominoPiece, for the placements in view
+        self.shown = {}
+        # Board units at the middle of the view, and pixels per board unit
+        self.view_x = 0
+        self.view_y = 0
+        self.zoom = 1.0
+        self._cull_trigger = Clock.create_trigger(self.cull)
+        self.bind(pos=self._cull_trigger, size=self._cull_trigger)
+        # Mexican Train rows kept between show_trains calls, None while showing a line
+        self.train_rows = None
+        self.train_hub = None
+        self.train_pieces = []
+
+        # Holds the train table
         self.center_layout = BoxLayout(orientation='horizontal', spacing=0, size_hint_x=None,
-                                        pos_hint={'center_x': 0.5, 'center_y': 1})
+                                        pos_hint={'center_x': 0.5, 'center_y': 0.5})
             
         self.center_layout.bind(minimum_width=self.center_layout.setter('width'))
-        # self.add_widget(Widget(size_hint_x=0.5))
         self.add_widget(self.center_layout)
-        
-        self.right_spacer = Widget(size_hint_x=0.3)
-        self.add_widget(self.right_spacer)
+
+    def show_trains(self, hub, trains, open_trains, names):
+        """Lay out a Mexican Train table: the hub, then a row per train with its open marker.
+
+        The rows stay up between calls, only pieces added since the last
+        call and changed markers are touched.
+        """
+        if self.train_rows is None or self.train_hub is not hub or len(self.train_rows) != len(trains):
+            self.clear()
+            self.train_hub = hub
+            column = BoxLayout(orientation='vertical', size_hint=(None, None), spacing=5)
+            column.bind(minimum_height=column.setter('height'), minimum_width=column.setter('width'))
+            hub_row = self._train_row(column, 'Hub')
+            self._add_train_piece(hub_row, hub)
+            self.train_rows = [self._train_row(column, '') for _ in trains]
+            self.center_layout.add_widget(column)
+
+        for row, name, train, is_open in zip(self.train_rows, names, trains, open_trains):
+            row.title.text = name + (' (open)' if is_open else '')
+            # The title is the first child, every other one is a piece
+            for piece in train[len(row.children) - 1:]:
+                self._add_train_piece(row, piece)
+
+    def _add_train_piece(self, row, piece):
+        widget = piece_pool.acquire(Domino(piece.value1, piece.value2))
+        row.add_widget(widget)
+        self.train_pieces.append(widget)
+
+    def _train_row(self, column, title):
+        row = BoxLayout(orientation='horizontal', size_hint=(None, None), height=45, spacing=5)
+        row.bind(minimum_width=row.setter('width'))
+        row.title = Label(text=title, size_hint=(None, None), size=(120, 40))
+        row.add_widget(row.title)
+        column.add_widget(row)
+        return row
 
     def add_piece(self, domino, position = 'end'):
-        piece = Domino(domino.value1, domino.value2)
-        domino_widget = DominoPiece(piece)
-
-        # Special handling for the first piece
-        if not self.pieces:
-            self.center_layout.spacing = 5  # Default spacing
-            self.center_layout.add_widget(domino_widget)
-            self.pieces.append(domino_widget)
+        """Add a piece at the 'start' or 'end' of the line."""
+        if self.snake is None:
+            # Rows are as wide as the board when the line starts, they are not laid out again
+            self.snake = SnakeLayout(max(self.width, 4 * SNAKE_LONG), self.gap)
+        index = self.snake.place(domino, position)
+        if position == 'start':
+            self.line.appendleft(domino)
+        elif position == 'end':
+            self.line.append(domino)
+        if self.snake.overlaps(index, *self.view_rect()):
+            self._show(index)
+
+    def view_rect(self):
+        """(left, bottom, right, top) of the board in view, in board units."""
+        half_width = self.width / 2 / self.zoom
+        half_height = self.height / 2 / self.zoom
+        return (self.view_x - half_width, self.view_y - half_height,
+                self.view_x + half_width, self.view_y + half_height)
+
+    def _show(self, index):
+        domino, _, _, rotation = self.snake.placements[index]
+        widget = piece_pool.acquire(Domino(domino.value1, domino.value2))
+        # The board's own Domino, what sync() compares
+        widget.source = domino
+        widget.rotation = rotation
+        self._move(widget, index)
+        self.add_widget(widget)
+        self.shown[index] = widget
+
+    def _move(self, widget, index):
+        _, x, y, _ = self.snake.placements[index]
+        width, height = SNAKE_LONG * self.zoom, SNAKE_SHORT * self.zoom
+        widget.size = (width, height)
+        widget.pos = (self.center_x + (x - self.view_x) * self.zoom - width / 2,
+                      self.center_y + (y - self.view_y) * self.zoom - height / 2)
+
+    def cull(self, *args):
+        """Give DominoPieces to the placements in view and take them back from the rest."""
+        if self.snake is None:
             return
+        visible = self.snake.visible(*self.view_rect())
+        for index in [index for index in self.shown if index not in visible]:
+            piece_pool.release(self.shown.pop(index))
+        for index in visible:
+            widget = self.shown.get(index)
+            if widget is None:
+                self._show(index)
+            else:
+                self._move(widget, index)
 
-        # Check if current or previous piece is a double
-        prev_piece = self.pieces[-1] if position == 'end' else self.pieces[0]
-        is_prev_double = prev_piece.domino.value1 == prev_piece.domino.value2
-        is_prev_normal = prev_piece.domino.value1 != prev_piece.domino.value2
-        is_curr_normal = piece.value1 != piece.value2
-        is_curr_double = piece.value1 == piece.value2
-
-        # # Adjust spacing based on piece combinations
-        # if is_prev_double and is_curr_normal:
-        #     self.center_layout.spacing = -10  # Reduced negative spacing
-        # else:
-        #     self.center_layout.spacing = 0  # Normal spacing
-
-        # if is_prev_normal and is_curr_double:
-        #     self.center_layout.spacing = -10  # Reduced negative spacing
-        # else:
-        #     self.center_layout.spacing = 0  # Normal spacing
+    def pan(self, dx, dy):
+        self.view_x -= dx / self.zoom
+        self.view_y -= dy / self.zoom
+        self._cull_trigger()
 
-        # if is_prev_normal and is_curr_normal:
-        #     self.center_layout.spacing = 0  # Normal spacing
+    def zoom_by(self, factor):
+        self.zoom = min(max(self.zoom * factor, MIN_ZOOM), MAX_ZOOM)
+        self._cull_trigger()
 
-                # Add widget based on position
-        if position == 'start':
-            # Set spacing based on piece combinations
-            if (is_prev_double and is_curr_normal) or (is_prev_normal and is_curr_double):
-                self.center_layout.spacing = -15
-            else:
-                self.center_layout.spacing = 5
-            
-            # Add the piece once
-            self.center_layout.add_widget(domino_widget, index=0)
-            self.pieces.insert(0, domino_widget)
-            return 
-        
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return False
+        if touch.is_mouse_scrolling:
+            self.zoom_by(ZOOM_STEP if touch.button == 'scrolldown' else 1 / ZOOM_STEP)
+            return True
+        touch.grab(self)
+        return True
 
-        else:  # position == 'end'
-            # Set spacing based on piece combinations
-            if (is_prev_double and is_curr_normal) or (is_prev_normal and is_curr_double):
-                self.center_layout.spacing = -15
-            else:
-                self.center_layout.spacing = 5
-            
-            # Add the piece once
-            self.center_layout.add_widget(domino_widget)
-            self.pieces.append(domino_widget)
-            return 
-        
+    def on_touch_move(self, touch):
+        if touch.grab_current is not self:
+            return False
+        self.pan(touch.dx, touch.dy)
+        return True
 
-        # Update spacer widths based on layout width
-        spacer_width = (1.0 - self.center_layout.width / self.width) / 2 if self.width else 0.5
-        self.left_spacer.size_hint_x = spacer_width
-        self.right_spacer.size_hint_x = spacer_width
+    def on_touch_up(self, touch):
+        if touch.grab_current is not self:
+            return False
+        touch.ungrab(self)
+        return True
 
     # def add_piece(self, domino, position = 'end'):
     #     piece = Domino(domino.value1, domino.value2)
@@ -419,38 +798,46 @@ class BoardLayout(BoxLayout):
     #     self.right_spacer.size_hint_x = spacer_width
 
     def clear(self):
+        for piece in list(self.shown.values()) + self.train_pieces:
+            piece_pool.release(piece)
         self.center_layout.clear_widgets()
-        self.pieces = []
-        # self.pieces.append((domino, position))
-
-    def calculate_position(self, previous_position, previous_domino, new_domino):
-        prev_width, prev_height = previous_domino.get_size()
-        new_width, new_height = new_domino.get_size()
-
-        if previous_domino.is_vertical:
-            new_x = previous_position[0]
-            new_y = previous_position[1] + prev_height + self.gap
-        else:
-            new_x = previous_position[0] + prev_width + self.gap
-            new_y = previous_position[1]
-
-        return (new_x, new_y)
-
-    def arrange_pieces(self):
-        if not self.pieces:
+        self.line.clear()
+        self.snake = None
+        self.shown = {}
+        self.view_x = 0
+        self.view_y = 0
+        self.train_rows = None
+        self.train_hub = None
+        self.train_pieces = []
+
+    def sync(self, board):
+        """Show the line in board, adding only the pieces played at either end since the last call.
+
+        line holds the board Dominoes already placed, so the new pieces are
+        found by walking in from the ends. Anything that is not the shown
+        line plus new ends (a new round, a train table) is rebuilt.
+        """
+        if self.train_rows is not None or (not board and self.line):
+            self.clear()
+        if not board:
             return
 
-        # Start with the first piece at a fixed position
-        first_position = (0, 0)
-        self.pieces[0] = (self.pieces[0][0], first_position)
+        if self.line:
+            first = self.line[0]
+            added_front = 0
+            while added_front < len(board) and board[added_front] is not first:
+                added_front += 1
+            last = added_front + len(self.line) - 1
+            if last < len(board) and board[last] is self.line[-1]:
+                for piece in reversed(board[:added_front]):
+                    self.add_piece(piece, 'start')
+                for piece in board[last + 1:]:
+                    self.add_piece(piece, 'end')
+                return
+            self.clear()
 
-        for i in range(1, len(self.pieces)):
-            prev_domino, prev_position = self.pieces[i-1]
-            new_domino, _ = self.pieces[i]
-            new_position = self.calculate_position(prev_position, prev_domino, new_domino)
-            self.pieces[i] = (new_domino, new_position)
-            
-        
+        for piece in board:
+            self.add_piece(piece, 'end')
 
     # def calculate_positions(self):
     #     """Calculate positions for all pieces based on total count"""
@@ -651,10 +1038,6 @@ class BoardLayout(BoxLayout):
     #         self.left_spacer.size_hint_x = spacer_width
     #         self.right_spacer.size_hint_x = spacer_width
 
-    def clear(self):
-
-        self.center_layout.clear_widgets()
-        self.pieces = []
 
 class DominoGameGUI(BoxLayout):
     def __init__(self, **kwargs):
@@ -715,36 +1098,54 @@ class DominoGameGUI(BoxLayout):
         # Create main content layout
         main_content = BoxLayout(orientation='vertical')
 
-        # Add existing widgets to main content
+        # Add existing widgets to main content. Scoring is the mode's RuleSet
+        # (see game_rules), here only how it is shown and whether it plays to target_score
         self.game_modes = {
             'Classic': {
                 'description': 'First to empty hand wins round',
-                'rules': 'Win by being first to play all your dominoes'
+                'rules': 'Win by being first to play all your dominoes',
+                'to_target': False
             },
             'Block': {
                 'description': 'Lowest sum wins when game is blocked',
-                'rules': 'When no one can play, lowest pip sum wins'
+                'rules': 'When no one can play, lowest pip sum wins',
+                'to_target': False
             },
             'Points': {
                 'description': 'Play to target score, collect opponent pips',
-                'rules': 'Score points equal to sum of opponents remaining pips'
+                'rules': 'Score points equal to sum of opponents remaining pips',
+                'to_target': True
+            },
+            'All-Fives': {
+                'description': 'Score the open ends whenever they add up to a multiple of five',
+                'rules': 'Doubles at an end count both halves, going out scores opponent pips to the nearest 5',
+                'to_target': True
+            },
+            'Mexican Train': {
+                'description': 'Own trains and a public Mexican train from a hub double',
+                'rules': 'Play on your train, the Mexican train or an open train; draw once, then pass and open yours',
+                'to_target': True
             }
         }
-        
-        self.current_mode = 'Classic'
+        self.set_mode('Classic')
         self.target_score = 100
+        # Set size, seats, deal and boneyard draws, changed from the Settings popup.
+        # A double-6 set with 6 pieces each, any set up to double-MAX_PIP_VALUE works
+        self.settings = GameSettings()
+        self.settings.max_piece_value = 6
+        self.settings.pieces_per_player = 6
+        self.settings.validate()
 
         # Add existing game state variables and GUI elements to main_content
         self.board = []
         self.current_player = 0
         self.players = []
-        self.player_names = ["Human Player", "Computer 1", "Computer 2", "Computer 3"]
+        # 2 to 10 seats, seat 0 is the human and seat i is played by ai_players[i - 1]
+        self.ai_players = []
+        self._seat_players()
         self.consecutive_passes = 0
-        self.scores = {name: 0 for name in self.player_names}
-        self.ai_players = [AIPlayer() for _ in range(3)]
         self.game_active = True
         self.winner = None
-        self.passes_per_player = {name: 0 for name in self.player_names}
 
         # Score display
         self.score_label = Label(text="Scores:", size_hint_y=0.1)
@@ -779,27 +1180,21 @@ class DominoGameGUI(BoxLayout):
         # Add left spacer (takes 20% of width)
         grid_container.add_widget(Widget(size_hint_x=0.35))
         
-        self.pieces_grid = GridLayout(
-            cols=8,
-            spacing=10,
-            padding=10,
+        # Scrolls once the hand is more than a few rows, see HandView
+        self.hand_view = HandView(
+            self.select_piece,
             size_hint_x=0.3,  # Grid takes 60% of width
             size_hint_y=0.9,
-            height=100,
-            row_default_height=80,
-            col_default_width=40,
-            col_force_default=True,
-            row_force_default=True
         )
         
-        grid_container.add_widget(self.pieces_grid)
+        grid_container.add_widget(self.hand_view)
         
         # Add right spacer (takes 20% of width)
         grid_container.add_widget(Widget(size_hint_x=0.35))
         
         hand_container = BoxLayout(orientation='vertical', size_hint_y=0.4)
         hand_container.add_widget(self.hand_label)
-        hand_container.add_widget(grid_container)  # Add the grid container instead of pieces_grid directly
+        hand_container.add_widget(grid_container)  # Add the grid container instead of hand_view directly
         main_content.add_widget(hand_container)
 
         # Add play and pass buttons at the bottom
@@ -871,33 +1266,13 @@ class DominoGameGUI(BoxLayout):
 
 
     def update_display(self):
-        # Update board display
-        self.board_layout.clear()
-        # # Then add each piece
-        for piece in self.board:
-            self.board_layout.add_piece(piece)
-
-        # Update pieces grid
-        self.pieces_grid.clear_widgets()
-        for i, piece in enumerate(self.players[0]):
-            piece_widget = DominoPiece(
-                piece,
-                size=(80, 40),
-                size_hint=(None, None),
-                pos_hint={},
-                background_color=(0.95, 0.95, 0.95, 0.1) if self.current_player == 0 
-                else (0.7, 0.7, 0.7, 1)
-
-            )
-            piece_widget.rotation = 90
-            
-
-            piece_widget.piece_index = i
-            if self.current_player == 0:
-                piece_widget.bind(on_press=self.select_piece)
-            if i == self.selected_piece_index and self.current_player == 0:
-                piece_widget.background_color = (0.2, 0.4, 0.2, 0.1)
-            self.pieces_grid.add_widget(piece_widget)
+        # Only what changed since the last call is touched, see BoardLayout.sync and _sync_hand
+        if self.current_mode == 'Mexican Train':
+            names = self.player_names + ['Mexican']
+            self.board_layout.show_trains(self.board[0], self.trains, self.train_open, names)
+        else:
+            self.board_layout.sync(self.board)
+        self._sync_hand()
 
     # Update labels
         self.hand_label.text = "Your pieces: (Waiting for other players)" if self.current_player != 0 else "Your pieces: Your turn!"
@@ -910,16 +1285,98 @@ class DominoGameGUI(BoxLayout):
 
         # self.board_display.text = " ".join(str(d) for d in self.board)
 
-    def select_piece(self, button):
-        for child in self.pieces_grid.children:
-            child.background_color = (0.3, 0.3, 0.3, 0.1) if self.current_player == 0 else (0.7, 0.7, 0.7, 1)
-        
-        # Update selected piece index and highlight the selected piece
-        self.selected_piece_index = button.piece_index
-        button.background_color = (0.2, 0.7, 0.2, 0.5)  # Highlight selected piece
+    def _sync_hand(self):
+        """Point hand_view at players[0] and show whose turn it is and the selected piece.
+
+        hand_view follows the hand's own pops and appends (see Hand.listener),
+        so only a new round's hand is loaded whole; the turn and the
+        selection cost a comparison each when they did not change.
+        """
+        my_turn = self.current_player == 0
+        self.hand_view.show_hand(self.players[0])
+        self.hand_view.set_turn(my_turn)
+        self.hand_view.select(self.selected_piece_index if my_turn else None)
+
+    def select_piece(self, index):
+        if self.current_player != 0:
+            return
+        self.selected_piece_index = index
+        self._sync_hand()
+
+    def _seat_players(self):
+        # Names, scores and AIs for settings.num_players seats, AIs keep their difficulty
+        num_players = self.settings.num_players
+        self.player_names = ["Human Player"] + [f"Computer {i}" for i in range(1, num_players)]
+        self.reset_scores()
+        self.passes_per_player = {name: 0 for name in self.player_names}
+        self.ai_players = self.ai_players[:num_players - 1]
+        self.ai_players += [AIPlayer() for _ in range(num_players - 1 - len(self.ai_players))]
+
+    def apply_settings(self, num_players, max_piece_value, pieces_per_player, draw_from_boneyard):
+        """Start a new game with these settings, or raise ValueError and keep the old ones."""
+        settings = GameSettings()
+        settings.num_players = num_players
+        settings.max_piece_value = max_piece_value
+        settings.pieces_per_player = pieces_per_player
+        settings.draw_from_boneyard = draw_from_boneyard
+        settings.validate()
+        if self.current_mode == mexican_train.MEXICAN_TRAIN:
+            mexican_train.check_settings(settings)
+
+        self.settings = settings
+        self._seat_players()
+        self.last_mode = None  # New seats, the highest double starts again
+        self._perform_restart()
+
+    def _game_settings_rows(self, content):
+        # Seats, set and deal typed in, boneyard draws toggled, all applied together
+        from kivy.uix.textinput import TextInput
+        fields = {}
+        for key, text in (('num_players', "Players (2-10):"),
+                          ('max_piece_value', f"Highest double (0-{MAX_PIP_VALUE}):"),
+                          ('pieces_per_player', "Pieces per player:")):
+            row = BoxLayout(spacing=10, size_hint_y=None, height=40)
+            row.add_widget(Label(text=text, size_hint_x=0.6))
+            fields[key] = TextInput(text=str(getattr(self.settings, key)), input_filter='int',
+                                    multiline=False, size_hint_x=0.4)
+            row.add_widget(fields[key])
+            content.add_widget(row)
+
+        draw_button = Button(size_hint_y=None, height=40)
+        draw_button.draw = self.settings.draw_from_boneyard
+
+        def show_draw(*args):
+            draw_button.text = f"Draw from boneyard: {'On' if draw_button.draw else 'Off'}"
+
+        def toggle_draw(instance):
+            draw_button.draw = not draw_button.draw
+            show_draw()
+
+        show_draw()
+        draw_button.bind(on_press=toggle_draw)
+        content.add_widget(draw_button)
+
+        def apply(instance):
+            try:
+                values = [int(fields[key].text) for key in ('num_players', 'max_piece_value', 'pieces_per_player')]
+            except ValueError:
+                self.show_popup("Error", "Please enter whole numbers")
+                return
+            try:
+                self.apply_settings(*values, draw_button.draw)
+            except ValueError as e:
+                self.show_popup("Error", str(e))
+                return
+            self.settings_popup.dismiss()
+            self.show_popup("Success", "Settings saved, a new game has started")
+
+        apply_button = Button(text='Apply and start a new game', size_hint_y=None, height=40)
+        apply_button.bind(on_press=apply)
+        content.add_widget(apply_button)
 
     def show_difficulty_settings(self, *args):
         content = BoxLayout(orientation='vertical', padding=10, spacing=10)
+        self._game_settings_rows(content)
         
         # Store buttons in a dictionary to access them later
         difficulty_buttons = {}
@@ -973,10 +1430,10 @@ class DominoGameGUI(BoxLayout):
         )
         
         self.settings_popup = Popup(
-            title='AI Difficulty Settings',
+            title='Game and AI Settings',
             content=content,
             size_hint=(None, None),
-            size=(400, 250),
+            size=(450, 480 + 50 * len(self.ai_players)),
         )
         
         close_button.bind(on_press=self.settings_popup.dismiss)
@@ -991,16 +1448,27 @@ class DominoGameGUI(BoxLayout):
 
         # Generate dominoes
         try:
-            dominoes = [Domino(i, j) for i in range(7) for j in range(i, 7)]
+            values = self.settings.max_piece_value + 1
+            dominoes = [Domino(i, j) for i in range(values) for j in range(i, values)]
+            per_player = self.settings.pieces_per_player
+            if per_player * len(self.player_names) > len(dominoes):
+                raise ValueError(f"double-{self.settings.max_piece_value} set is too small to deal "
+                                 f"{per_player} pieces to {len(self.player_names)} players")
             random.shuffle(dominoes)
 
+            hub = None
+            if self.current_mode == 'Mexican Train':
+                # The hub double stays out of the deal
+                hub_value = self.settings.max_piece_value - self.train_round % values
+                self.train_round += 1
+                hub = next(d for d in dominoes if d.value1 == d.value2 == hub_value)
+                dominoes.remove(hub)
+                if per_player * len(self.player_names) > len(dominoes):
+                    raise ValueError("No pieces left for the hub double")
+
             # Distribute pieces
-            self.players = [
-                dominoes[:6],
-                dominoes[6:12],
-                dominoes[12:18],
-                dominoes[18:24]
-            ]
+            self.players = [Hand(dominoes[i * per_player:(i + 1) * per_player])
+                            for i in range(len(self.player_names))]
 
             
 
@@ -1012,11 +1480,14 @@ class DominoGameGUI(BoxLayout):
                 self.current_player = self.last_winner
 
 
-            self.remaining_pieces = dominoes[24:]
+            self.remaining_pieces = dominoes[len(self.players) * per_player:]
             self.board = []  # Start with empty board
+            if hub is not None:
+                self._start_trains(hub)
 
 
             self.update_display()
+            Logger.info(f"DominoPiece: pool {piece_pool.report()}")
             
             # Automatically play first move if AI is starting player
             if self.current_player != 0:  # If not human player
@@ -1102,6 +1573,9 @@ class DominoGameGUI(BoxLayout):
             return False
 
         piece = current_player_hand[self.selected_piece_index]
+
+        if self.current_mode == 'Mexican Train':
+            return self.play_on_train(self.selected_piece_index)
         
         # Handle empty board case
         if not self.board:
@@ -1158,17 +1632,6 @@ class DominoGameGUI(BoxLayout):
                 self.board.insert(0, piece)
             else:
                 self.board.append(piece)
-            
-
-           
-            for domino_widget in self.board_layout.pieces:
-                if domino_widget.domino == piece:
-                    if flip_needed:
-                        anim = Animation(rotation=360, duration=1)
-                    def on_flip_complete(anim, widget):
-                        anim.bind(on_complete=on_flip_complete)
-                        anim.start(domino_widget)
-                    break
             return True
 
 
@@ -1368,8 +1831,10 @@ class DominoGameGUI(BoxLayout):
         popup.open()
 
     def handle_pass(self, *args):
+        if self.current_mode == 'Mexican Train' and not self._train_pass():
+            return
     # For human player, check if they have any valid moves
-        if self.current_player == 0:
+        if self.current_player == 0 and self.current_mode != 'Mexican Train':
             # Check if there are any valid moves available
             has_valid_move = False
             if not self.board:
@@ -1389,6 +1854,15 @@ class DominoGameGUI(BoxLayout):
             if has_valid_move:
                 self.show_popup("Invalid Pass", "You have valid moves available!")
                 return
+
+            if self.settings.draw_from_boneyard and self.remaining_pieces:
+                drawn = len(self.remaining_pieces)
+                piece = self.draw_until_playable(0)
+                drawn -= len(self.remaining_pieces)
+                self.update_display()
+                if piece is not None:
+                    self.show_popup("Draw", f"You drew {drawn} piece(s), {piece} can be played")
+                    return
         # If we get here, either it's an AI player or human player with no valid moves
         self.consecutive_passes += 1
         self.passes_per_player[self.player_names[self.current_player]] += 1
@@ -1419,204 +1893,50 @@ class DominoGameGUI(BoxLayout):
         # Schedule the popup to close after 1 second
         Clock.schedule_once(pass_popup.dismiss, 1)
 
-        if self.consecutive_passes >= 4:
-            if self.current_mode == 'Block':
-                self.handle_block_deadlock()
-
-            elif self.current_mode == 'Points':
-                self.handle_points_deadlock()
-            else:  # Classic mode
-                self.handle_classic_deadlock()
+        if self.consecutive_passes >= self.settings.num_players:
+            self.handle_deadlock()
         else:
             self.next_turn()
         
 
-    def handle_classic_deadlock(self):
+    def handle_deadlock(self):
         player_sums = [self.calculate_player_sum(p) for p in self.players]
-        min_sum = min(player_sums)
-        
-        # Find all players with the minimum sum
-        min_sum_indices = [i for i, sum_value in enumerate(player_sums) if sum_value == min_sum]
-        
-        if len(min_sum_indices) > 1:
-            # First tiebreaker: fewest passes
-            min_passes = min(self.passes_per_player[self.player_names[i]] for i in min_sum_indices)
-            min_pass_indices = [i for i in min_sum_indices 
-                            if self.passes_per_player[self.player_names[i]] == min_passes]
-            
-            if len(min_pass_indices) > 1:
-                # Second tiebreaker: player position (earlier player wins)
-                winner_index = min(min_pass_indices)
-            else:
-                winner_index = min_pass_indices[0]
-        else:
-            winner_index = player_sums.index(min_sum)
+        passes = [self.passes_per_player[name] for name in self.player_names]
+        winner_index = self.rules.tiebreak(player_sums, passes)
+        decided_by = deadlock_reason(player_sums, passes, winner_index)
+        winner_name = self.player_names[winner_index]
+        min_sum = player_sums[winner_index]
 
-        # Update scores for the winner
-        self.scores[self.player_names[winner_index]] += 1
+        points = self.rules.payout(player_sums, self.remaining_pips(), winner_index)
+        self.scores[winner_name] += points
 
         # Update winner information for the next round
         self.last_winner = winner_index
         self.last_mode = self.current_mode
 
         result_message = "Game is blocked!\n\n"
-        result_message += "In Classic mode, when the game is blocked, the player with the lowest pip sum wins.\n\n"
+        result_message += f"In {self.current_mode} mode, when the game is blocked, the player with the lowest pip sum wins.\n\n"
         for i, sum_value in enumerate(player_sums):
-            result_message += f"{self.player_names[i]} total: {sum_value} (Passes: {self.passes_per_player[self.player_names[i]]})\n"
-        
-        if len(min_sum_indices) > 1:
-            if len(min_pass_indices) > 1:
-                result_message += f"\n{self.player_names[winner_index]} wins with the lowest sum of {min_sum}, "
-                result_message += f"fewest passes ({self.passes_per_player[self.player_names[winner_index]]}) "
-                result_message += "and earliest player position!"
-            else:
-                result_message += f"\n{self.player_names[winner_index]} wins with the lowest sum of {min_sum} "
-                result_message += f"and fewest passes ({self.passes_per_player[self.player_names[winner_index]]})!"
-        else:
-            result_message += f"\n{self.player_names[winner_index]} wins with the lowest sum of {min_sum}!"
-            
-        result_message += "\n\nWould you like to start a new round?"
-
-        self._show_deadlock_popup("Classic Game Blocked", result_message)
-
-
-    def handle_points_deadlock(self):
-        player_sums = [self.calculate_player_sum(p) for p in self.players]
-        min_sum = min(player_sums)
-        
-        # Find all players with the minimum sum
-        min_sum_indices = [i for i, sum_value in enumerate(player_sums) if sum_value == min_sum]
-        
-        if len(min_sum_indices) > 1:
-            # First tiebreaker: fewest passes
-            min_passes = min(self.passes_per_player[self.player_names[i]] for i in min_sum_indices)
-            min_pass_indices = [i for i in min_sum_indices 
-                            if self.passes_per_player[self.player_names[i]] == min_passes]
-            
-            if len(min_pass_indices) > 1:
-                # Second tiebreaker: player position (earlier player wins)
-                winner_index = min(min_pass_indices)
-            else:
-                winner_index = min_pass_indices[0]
+            result_message += f"{self.player_names[i]} total: {sum_value} (Passes: {passes[i]})\n"
+
+        if decided_by == BY_SEAT:
+            result_message += f"\n{winner_name} wins with the lowest sum of {min_sum}, "
+            result_message += f"fewest passes ({passes[winner_index]}) "
+            result_message += "and earliest player position!"
+        elif decided_by == BY_PASSES:
+            result_message += f"\n{winner_name} wins with the lowest sum of {min_sum} "
+            result_message += f"and fewest passes ({passes[winner_index]})!"
         else:
-            winner_index = player_sums.index(min_sum)
+            result_message += f"\n{winner_name} wins with the lowest sum of {min_sum}!"
 
-        # Calculate total points from all remaining dominoes
-        total_points = sum(player_sums)
-        
-        # Award points to the winner
-        self.scores[self.player_names[winner_index]] += total_points
-
-        # Store winner information for the next round
-        self.last_winner = winner_index
-        self.last_mode = self.current_mode
-
-        result_message = "Game is blocked!\n\n"
-        result_message += "In Points mode, when the game is blocked, the player with the lowest pip sum wins all remaining points.\n\n"
-        for i, sum_value in enumerate(player_sums):
-
-            result_message += f"{self.player_names[i]} total: {sum_value} (Passes: {self.passes_per_player[self.player_names[i]]})\n"
-        
-        if len(min_sum_indices) > 1:
-            if len(min_pass_indices) > 1:
-                result_message += f"\n{self.player_names[winner_index]} wins with the lowest sum of {min_sum}, "
-                result_message += f"fewest passes ({self.passes_per_player[self.player_names[winner_index]]}) "
-                result_message += "and earliest player position!"
-            else:
-                result_message += f"\n{self.player_names[winner_index]} wins with the lowest sum of {min_sum} "
-                result_message += f"and fewest passes ({self.passes_per_player[self.player_names[winner_index]]})!"
-        else:
-            result_message += f"\n{self.player_names[winner_index]} wins with the lowest sum of {min_sum}!"
-        
-        result_message += f"\nPoints awarded: {total_points}"
-        
-        if self.scores[self.player_names[winner_index]] >= self.target_score:
-            self.show_final_winner_popup(self.player_names[winner_index])
-        else:
-            result_message += "\n\nWould you like to start a new round?"
-            self._show_deadlock_popup("Points Game Blocked", result_message)
-    
-
-    def handle_block_deadlock(self):
-        player_sums = [self.calculate_player_sum(p) for p in self.players]
-        min_sum = min(player_sums)
-        
-        # Find all players with the minimum sum
-        min_sum_indices = [i for i, sum_value in enumerate(player_sums) if sum_value == min_sum]
-        
-        if len(min_sum_indices) > 1:
-            # First tiebreaker: fewest passes
-            min_passes = min(self.passes_per_player[self.player_names[i]] for i in min_sum_indices)
-            min_pass_indices = [i for i in min_sum_indices 
-                            if self.passes_per_player[self.player_names[i]] == min_passes]
-            
-            if len(min_pass_indices) > 1:
-                # Second tiebreaker: player position (earlier player wins)
-                winner_index = min(min_pass_indices)
-            else:
-                winner_index = min_pass_indices[0]
-        else:
-            winner_index = player_sums.index(min_sum)
-
-        # Update scores for the winner
-        self.scores[self.player_names[winner_index]] += 1
-
-        # Store winner information for the next round
-        self.last_winner = winner_index
-        self.last_mode = self.current_mode
-
-        result_message = "Block Game Deadlock!\n\n"
-        result_message += "In Block mode, the player with the lowest pip sum wins when the game is blocked.\n\n"
-        for i, sum_value in enumerate(player_sums):
+        if self.to_target:
+            result_message += f"\nPoints awarded: {points}"
+            if self.scores[winner_name] >= self.target_score:
+                self.show_final_winner_popup(winner_name)
+                return
 
-            result_message += f"{self.player_names[i]} total: {sum_value} (Passes: {self.passes_per_player[self.player_names[i]]})\n"
-        
-        if len(min_sum_indices) > 1:
-            if len(min_pass_indices) > 1:
-                result_message += f"\n{self.player_names[winner_index]} wins with the lowest sum of {min_sum}, "
-                result_message += f"fewest passes ({self.passes_per_player[self.player_names[winner_index]]}) "
-                result_message += "and earliest player position!"
-            else:
-                result_message += f"\n{self.player_names[winner_index]} wins with the lowest sum of {min_sum} "
-                result_message += f"and fewest passes ({self.passes_per_player[self.player_names[winner_index]]})!"
-        else:
-            result_message += f"\n{self.player_names[winner_index]} wins with the lowest sum of {min_sum}!"
-            
         result_message += "\n\nWould you like to start a new round?"
-
-        self._show_deadlock_popup("Block Game Blocked", result_message)
-
-        # Create confirmation popup
-        content = BoxLayout(orientation='vertical', padding=10)
-        content.add_widget(Label(text=result_message))
-        
-        buttons = BoxLayout(size_hint_y=0.4, spacing=10)
-        yes_button = Button(text='Yes')
-        no_button = Button(text='No')
-        buttons.add_widget(yes_button)
-        buttons.add_widget(no_button)
-        content.add_widget(buttons)
-        
-        popup = Popup(
-            title='Block Game Over',
-            content=content,
-            size_hint=(None, None),
-            size=(500, 400),  # Made larger to accommodate the longer message
-            auto_dismiss=False
-        )
-        
-        def on_yes(instance):
-            popup.dismiss()
-            self.restart_game()
-            
-        def on_no(instance):
-            popup.dismiss()
-            self.game_active = False
-            self.status_bar.text = "Game Over. Click 'New Game' to play again."
-        
-        yes_button.bind(on_press=on_yes)
-        no_button.bind(on_press=on_no)
-        popup.open()
+        self._show_deadlock_popup(f"{self.current_mode} Game Blocked", result_message)
 
 
     def _show_deadlock_popup(self, title, message):
@@ -1660,9 +1980,153 @@ class DominoGameGUI(BoxLayout):
         popup.open()
 
 
+    def _start_trains(self, hub):
+        self.board = [hub]
+        # Train i belongs to seat i, the last one is the Mexican train
+        self.trains = [[] for _ in range(self.settings.num_players + 1)]
+        self.train_ends = [hub.value1] * (self.settings.num_players + 1)
+        self.train_open = [False] * self.settings.num_players + [True]
+        self.drew_this_turn = False
+
+    def train_moves(self, player):
+        """(piece index, train) for every legal Mexican Train play, an open own train first.
+
+        The hand's bitmask against VALUE_MASK of each usable train end gives
+        the tiles that fit; only their pieces are looked up in the hand.
+        """
+        hand = self.players[player]
+        fits = {}
+        any_fit = 0
+        for train, end in enumerate(self.train_ends):
+            if train == player or self.train_open[train]:
+                fits[train] = hand.mask & VALUE_MASK[end]
+                any_fit |= fits[train]
+        if not any_fit:
+            return []
+
+        moves = []
+        for tile in iter_tiles(any_fit):
+            i = hand.index(hand.pieces[tile])
+            bit = 1 << tile
+            moves.extend((i, train) for train, mask in fits.items() if mask & bit)
+        own_open = self.train_open[player]
+        # Own train first while it is open (playing there closes it), last otherwise
+        moves.sort(key=lambda move: (move[1] != player) if own_open else (move[1] == player))
+        return moves
+
+    def play_on_train(self, piece_index, train=None):
+        """Play a piece of the current player on a train, asking which one when several fit."""
+        player = self.current_player
+        trains = [t for i, t in self.train_moves(player) if i == piece_index]
+        if not trains:
+            if player == 0:
+                self.show_popup("Invalid Move", "This piece cannot be played on any of your trains!")
+                self.selected_piece_index = None
+                self.update_display()
+            return False
+        if train is None and len(trains) > 1 and player == 0:
+            self.show_train_choice_popup(piece_index, trains)
+            return False
+        self._place_on_train(piece_index, trains[0] if train is None else train)
+        return True
+
+    def _place_on_train(self, piece_index, train):
+        player = self.current_player
+        piece = self.players[player].pop(piece_index)
+        end = self.train_ends[train]
+        if piece.value1 != end:
+            piece.flip()
+        self.trains[train].append(piece)
+        self.board.append(piece)
+
+        self.train_ends[train] = piece.value2
+        if train == player:
+            self.train_open[player] = False
+
+        self.consecutive_passes = 0
+        self.selected_piece_index = None
+        self.check_win_condition()
+        if self.game_active:
+            self.next_turn()
+
+    def show_train_choice_popup(self, piece_index, trains):
+        piece = self.players[self.current_player][piece_index]
+        content = BoxLayout(orientation='vertical', padding=10)
+        content.add_widget(Label(text=f"Choose a train for {piece}:"))
+
+        buttons = BoxLayout(size_hint_y=0.4, spacing=10)
+        content.add_widget(buttons)
+        popup = Popup(
+            title='Choose Train',
+            content=content,
+            size_hint=(None, None),
+            size=(120 * len(trains) + 60, 200),
+            auto_dismiss=False
+        )
+        names = self.player_names + ['Mexican']
+        for train in trains:
+            button = Button(text=names[train])
+
+            def play_here(instance, train=train):
+                popup.dismiss()
+                self._place_on_train(piece_index, train)
+
+            button.bind(on_press=play_here)
+            buttons.add_widget(button)
+        popup.open()
+
+    def _train_pass(self):
+        """Draw once or open the train before a Mexican Train pass, False while the turn goes on."""
+        player = self.current_player
+        if player == 0 and self.train_moves(0):
+            self.show_popup("Invalid Pass", "You have valid moves available!")
+            return False
+        if not self.drew_this_turn and self.remaining_pieces:
+            self.players[player].append(self.remaining_pieces.pop())
+            self.drew_this_turn = True
+            if self.train_moves(player):
+                self.update_display()
+                if player == 0:
+                    self.show_popup("Draw", f"You drew {self.players[0][-1]}, it can be played")
+                else:
+                    self.handle_ai_turn()
+                return False
+
+        # A draw or a newly opened train gives everybody something new,
+        # only passes after it count towards a blocked game
+        if self.drew_this_turn or not self.train_open[player]:
+            self.consecutive_passes = 0
+        self.train_open[player] = True
+        return True
+
+    def handle_ai_train_turn(self, ai_player):
+        moves = self.train_moves(self.current_player)
+        if not moves:
+            self.status_bar.text = f"{self.player_names[self.current_player]} is passing"
+            self.handle_pass()
+            return
+        piece_index, train = ai_player.choose_train_move(self.players[self.current_player], moves)
+        self._place_on_train(piece_index, train)
+
+    def draw_until_playable(self, player):
+        """Draw from the boneyard into the player's hand until a piece fits the board.
+
+        Only the drawn piece is checked, the hand was already known not to
+        fit. Returns that piece, or None if the boneyard ran out first.
+        """
+        hand = self.players[player]
+        left_end, right_end = self.board[0].value1, self.board[-1].value2
+        while self.remaining_pieces:
+            piece = self.remaining_pieces.pop()
+            hand.append(piece)
+            if piece.value1 in (left_end, right_end) or piece.value2 in (left_end, right_end):
+                return piece
+        return None
+
     def next_turn(self):
-        self.current_player = (self.current_player + 1) % 4
+        self.current_player = (self.current_player + 1) % self.settings.num_players
         self.selected_piece_index = None #Reset selection
+        self.drew_this_turn = False
 
 
         # Handle AI turns
@@ -1678,7 +2142,13 @@ class DominoGameGUI(BoxLayout):
             return
 
         ai_index = self.current_player - 1  # Adjust index for AI players array
+        if self.current_mode == 'Mexican Train':
+            self.handle_ai_train_turn(self.ai_players[ai_index])
+            return
         move_index = self.ai_players[ai_index].choose_move(self.players[self.current_player], self.board)
+        if move_index is None and self.settings.draw_from_boneyard and self.board:
+            if self.draw_until_playable(self.current_player) is not None:
+                move_index = self.ai_players[ai_index].choose_move(self.players[self.current_player], self.board)
 
         if move_index is not None:
             piece = self.players[self.current_player][move_index]
@@ -1727,6 +2197,13 @@ class DominoGameGUI(BoxLayout):
             
             # Create update function that updates all button colors
             def update_mode(btn, selected_mode=mode, buttons=mode_buttons):
+                if selected_mode == mexican_train.MEXICAN_TRAIN:
+                    try:
+                        mexican_train.check_settings(self.settings)
+                    except ValueError as e:
+                        self.show_popup("Error", f"{e}\nChange it in Settings first")
+                        return
+
                 # Update all button colors
                 for m, b in buttons.items():
                     if m == selected_mode:
@@ -1735,8 +2212,8 @@ class DominoGameGUI(BoxLayout):
                         b.background_color = (0.3, 0.5, 0.4, 0.9)
                 
                 # Change game mode
-                self.current_mode = selected_mode
-                self.scores = {name: 0 for name in self.player_names}  # Reset scores
+                self.set_mode(selected_mode)
+                self.reset_scores()
                 if hasattr(self, 'last_mode'):
                     self.last_mode = None  # Reset last mode to force highest double start
                 
@@ -1751,7 +2228,7 @@ class DominoGameGUI(BoxLayout):
             row.add_widget(btn)
             content.add_widget(row)
 
-        if self.current_mode == 'Points':
+        if self.to_target:
             score_input = BoxLayout(size_hint_y=None, height=20)
             score_input.add_widget(Label(text="Target Score:"))
             score_btn = Button(
@@ -1780,30 +2257,49 @@ class DominoGameGUI(BoxLayout):
         popup.open()
 
 
+    def set_mode(self, mode):
+        # Rules are looked up once here, not on every play
+        self.current_mode = mode
+        self.rules = get_rules(mode)
+        self.to_target = self.game_modes[mode]['to_target']
+        # Mexican Train hub moves one double down every round, from the highest one at a match start
+        self.train_round = 0
+
+    def reset_scores(self):
+        # A new match, which also starts the Mexican Train hubs over like the engine's match_start
+        self.scores = {name: 0 for name in self.player_names}
+        self.train_round = 0
+
+    def open_end_sum(self):
+        # Only the two end pieces matter, a double there counts both halves
+        if len(self.board) == 1:
+            return self.board[0].get_score()
+        first, last = self.board[0], self.board[-1]
+        left = first.value1 * (2 if first.value1 == first.value2 else 1)
+        right = last.value2 * (2 if last.value1 == last.value2 else 1)
+        return left + right
+
     def check_win_condition(self):
+        name = self.player_names[self.current_player]
+        if self.rules.play_score is not None and self.board:
+            points = self.rules.play_score(self.open_end_sum())
+            if points:
+                self.scores[name] += points
+                self.status_bar.text = f"{name} scores {points}"
+
         if len(self.players[self.current_player]) == 0:
             self.game_active = False
-            
-            if self.current_mode == 'Points':
-                # Calculate points from remaining pieces
-                round_points = sum(sum(piece.get_score() for piece in hand) for hand in self.players)
-                self.scores[self.player_names[self.current_player]] += round_points
-                
-                if self.scores[self.player_names[self.current_player]] >= self.target_score:
-                    self.show_final_winner_popup(self.player_names[self.current_player])
-                else:
-                    self.show_round_winner_popup(self.player_names[self.current_player], round_points)
-            elif self.current_mode == 'Block':
-                # For Block mode, handle blocked game differently
-                if self.consecutive_passes >= 4:
-                    # self.handle_deadlock()
-                    self.handle_block_deadlock()
-                else:
-                    self.scores[self.player_names[self.current_player]] += 1
-                    self.show_round_winner_popup(self.player_names[self.current_player])
-            else:  # Classic mode
-                self.scores[self.player_names[self.current_player]] += 1
-                self.show_round_winner_popup(self.player_names[self.current_player])
+
+            player_sums = [self.calculate_player_sum(p) for p in self.players]
+            round_points = self.rules.payout(player_sums, self.remaining_pips(), self.current_player)
+            self.scores[name] += round_points
+
+            if not self.to_target:
+                self.show_round_winner_popup(name)
+            elif self.scores[name] >= self.target_score:
+                self.show_final_winner_popup(name)
+            else:
+                self.show_round_winner_popup(name, round_points)
 
 
     def show_round_winner_popup(self, winner_name, points=None):
@@ -1843,7 +2339,11 @@ class DominoGameGUI(BoxLayout):
     
 
     def calculate_player_sum(self, player):
-        return sum(piece.value1 + piece.value2 for piece in player)
+        return player.pips
+
+    def remaining_pips(self):
+        # O(players), every Hand keeps its own total
+        return sum(hand.pips for hand in self.players)
 
     def show_score_input(self):
         content = BoxLayout(orientation='vertical', padding=10, spacing=10)
@@ -1932,7 +2432,7 @@ class DominoGameGUI(BoxLayout):
         
         def start_new_game(instance):
             popup.dismiss()
-            self.scores = {name: 0 for name in self.player_names}  # Reset scores
+            self.reset_scores()
             self.restart_game()
         
         def quit_game(instance):
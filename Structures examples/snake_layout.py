@@ -0,0 +1,109 @@
+"""Snake layout of a line of dominoes, shared by the Kivy board layouts."""
+
+
+# Board pieces lying along the line are (SNAKE_LONG x SNAKE_SHORT) at zoom 1
+SNAKE_LONG = 80
+SNAKE_SHORT = 40
+# rotation that puts a piece's value1 on the side (dx, dy), see SnakeLayout.place
+VALUE1_ROTATIONS = {(-1, 0): 0, (1, 0): 180, (0, 1): 270, (0, -1): 90}
+
+
+class SnakeLayout:
+    """Where each piece of the line goes, in board units with the first piece at (0, 0).
+
+    The 'end' of the line runs right and turns down at the side of a
+    row_width wide board, the 'start' runs left and turns up, so rows
+    go back and forth instead of running off the board. Only the two
+    ends of a line are laid out; spinner arms exist in the engine
+    (SpinnerBoard) only, the Kivy game plays a two-ended line. Every
+    place() only moves the cursor of its own side, so a piece costs the
+    same however long the line is, and rows buckets the pieces by row
+    so visible() only looks at the rows in view.
+    """
+
+    def __init__(self, row_width, gap=5, long=SNAKE_LONG, short=SNAKE_SHORT):
+        # A corner stands just past the last piece of a row, keep room for it
+        self.half_width = row_width / 2 - short - gap
+        self.long = long
+        self.short = short
+        self.gap = gap
+        self.row_step = long + gap
+        # (domino, center_x, center_y, rotation) of every piece placed
+        self.placements = []
+        # row -> indexes of the placements reaching into it
+        self.rows = {}
+        # 'start'/'end' -> [edge, row_y, dx, turned]: the next piece's near side
+        # is at x = edge and it runs along dx, in the row centred on row_y
+        self.cursors = {}
+
+    def place(self, domino, side='end'):
+        """Put domino at side of the line and return its placement index."""
+        is_double = domino.value1 == domino.value2
+        length = self.short if is_double else self.long
+        if not self.placements:
+            self.cursors['end'] = [length / 2 + self.gap, 0, 1, False]
+            self.cursors['start'] = [-length / 2 - self.gap, 0, -1, False]
+            return self._add(domino, 0, 0, 90 if is_double else 0)
+
+        if side not in self.cursors:
+            raise ValueError(f"Pieces only go at the 'start' or 'end' of the line, not {side!r}")
+        cursor = self.cursors[side]
+        edge, row_y, dx, turned = cursor
+        if abs(edge + dx * length) > self.half_width:
+            return self._turn(domino, side, cursor)
+        if turned and is_double:
+            # A double crossing the new row would hit the corner, it goes beside it
+            edge += dx * (self.short + self.gap)
+
+        cursor[0] = edge + dx * (length + self.gap)
+        cursor[3] = False
+        rotation = 90 if is_double else self._rotation(side, dx, 0)
+        return self._add(domino, edge + dx * length / 2, row_y, rotation)
+
+    def _turn(self, domino, side, cursor):
+        # The corner piece stands at the side of the board and leads into a new row
+        edge, row_y, dx, turned = cursor
+        down = -1 if side == 'end' else 1
+        x = edge + dx * self.short / 2
+        y = row_y + down * (self.long - self.short) / 2
+        rotation = 90 if domino.value1 == domino.value2 else self._rotation(side, 0, down)
+        cursor[:] = [edge + dx * self.short, row_y + down * self.row_step, -dx, True]
+        return self._add(domino, x, y, rotation)
+
+    def _rotation(self, side, dx, dy):
+        # value1 touches the piece before it at the end, and points away from it at the start
+        if side == 'start':
+            return VALUE1_ROTATIONS[(dx, dy)]
+        return VALUE1_ROTATIONS[(-dx, -dy)]
+
+    def _add(self, domino, x, y, rotation):
+        index = len(self.placements)
+        self.placements.append((domino, x, y, rotation))
+        half_height = self.extent(index)[1]
+        for row in range(self.row(y - half_height), self.row(y + half_height) + 1):
+            self.rows.setdefault(row, []).append(index)
+        return index
+
+    def row(self, y):
+        return int((y + self.row_step / 2) // self.row_step)
+
+    def extent(self, index):
+        """Half width and half height of the placement as it lies on the board."""
+        rotation = self.placements[index][3]
+        if rotation in (90, 270):
+            return self.short / 2, self.long / 2
+        return self.long / 2, self.short / 2
+
+    def overlaps(self, index, left, bottom, right, top):
+        _, x, y, _ = self.placements[index]
+        half_width, half_height = self.extent(index)
+        return x + half_width > left and x - half_width < right and y + half_height > bottom and y - half_height < top
+
+    def visible(self, left, bottom, right, top):
+        """Indexes of the placements overlapping the rectangle."""
+        found = set()
+        for row in range(self.row(bottom), self.row(top) + 1):
+            for index in self.rows.get(row, ()):
+                if index not in found and self.overlaps(index, left, bottom, right, top):
+                    found.add(index)
+        return found
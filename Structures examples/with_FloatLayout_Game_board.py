@@ -13,6 +13,7 @@ from kivy.clock import Clock  # Add this import
 from kivy.graphics import Rectangle, Color, Ellipse, PushMatrix, PopMatrix, Line, Scale, Rotate
 from kivy.properties import NumericProperty
 from kivy.animation import Animation
+from snake_layout import SNAKE_LONG, SnakeLayout
 import random
 
 class Domino:
@@ -263,38 +264,28 @@ class BoardLayout(FloatLayout):
         self.size_hint = (1, 1)
         self.gap = gap
         self.pieces = []
+        self.snake = None
 
     def add_piece(self, domino, position='end'):
-        piece = Domino(domino.value1, domino.value2)
-        domino_widget = DominoPiece(piece)
-
-        # Special handling for the first piece
-        if not self.pieces:
-            # Center the first piece
-            domino_widget.pos_hint = {'center_x': 0.5, 'center_y': 0.5}
-            self.add_widget(domino_widget)
-            self.pieces.append(domino_widget)
+        # The SnakeLayout says where it goes, pieces off the board get no widget
+        if self.snake is None:
+            self.snake = SnakeLayout(max(self.width, 4 * SNAKE_LONG), self.gap)
+        index = self.snake.place(domino, position)
+        if not self.snake.overlaps(index, -self.width / 2, -self.height / 2, self.width / 2, self.height / 2):
             return
 
-        # Calculate the position for the new piece
-        last_piece = self.pieces[-1]
-        last_size = last_piece.get_size()
-
-        # Determine new position based on the last piece's position and size
-        if last_piece.is_vertical:
-            new_x = last_piece.center_x
-            new_y = last_piece.center_y + last_size[1] / 2 + self.gap
-        else:
-            new_x = last_piece.center_x + last_size[0] / 2 + self.gap
-            new_y = last_piece.center_y
-
-        # Set the position of the new piece
-        domino_widget.pos_hint = {'center_x': new_x / self.width, 'center_y': new_y / self.height}
-            
+        _, x, y, rotation = self.snake.placements[index]
+        domino_widget = DominoPiece(Domino(domino.value1, domino.value2))
+        domino_widget.rotation = rotation
+        # Board units are pixels from the middle of the board
+        domino_widget.pos_hint = {'center_x': 0.5 + x / self.width, 'center_y': 0.5 + y / self.height}
+        self.add_widget(domino_widget)
+        self.pieces.append(domino_widget)
 
     def clear(self):
         self.clear_widgets()
         self.pieces = []
+        self.snake = None
 
 
     